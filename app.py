@@ -1,19 +1,214 @@
-from flask import Flask, render_template, jsonify
-import planet  # Replace with your actual simulation script
+import json
+import math
+import os
+import tempfile
+
+from flask import Flask, Response, abort, render_template, jsonify, request, stream_with_context, url_for
+import simulation
+from web import binary
+from web.cache import ResultCache, cache_key
+from web.downsample import downsample, lttb
+from web.jobs import JobQueue, QueueFull
 
 app = Flask(__name__)
 
+MAX_STEPS = 20000
+MAX_PLANETS = 2000
+CACHEABLE_SAMPLES = 5000  # Longer streamed runs aren't buffered for the cache
+MAX_POINTS = 10000  # Largest ?points= a chart may ask for
+MAX_TRAJECTORY_FRAMES = 1000  # Per response; longer ranges are downsampled
+# Trajectories are written inside the request, so keep new ones (steps x
+# planets) well within gunicorn's worker timeout; ~5 s at 20000 x 100
+MAX_TRAJECTORY_WORK = 2000000
+TRAJECTORY_COLUMNS = ('id', 'x', 'y', 'radius')
+
+# Full per-body trajectories, one compressed file per parameter set
+TRAJECTORY_DIR = os.environ.get('SIM_TRAJECTORY_DIR') or os.path.join(tempfile.gettempdir(), 'dahacks-trajectories')
+
+# Runs are deterministic for a given parameter set, so results can be reused.
+# Set SIM_CACHE_DIR to share them between gunicorn workers through the disk.
+result_cache = ResultCache(
+    maxsize=int(os.environ.get('SIM_CACHE_SIZE', 128)),
+    directory=os.environ.get('SIM_CACHE_DIR'),
+)
+
+# Background runs for ?async=1, so long simulations don't hold a request
+# open until gunicorn's worker timeout. Jobs are per process: use one
+# worker (or sticky routing) for the job endpoints.
+job_queue = JobQueue(
+    workers=int(os.environ.get('SIM_JOB_WORKERS', 2)),
+    max_active=int(os.environ.get('SIM_JOB_QUEUE', 8)),
+    on_done=result_cache.put,
+)
+
+def simulation_params():
+    # Query-string parameters shared by the simulate endpoints
+    preset = request.args.get('preset', simulation.DEFAULT_PRESET)
+    if preset not in simulation.PRESETS:
+        raise ValueError(f"unknown preset {preset!r}")
+    steps = request.args.get('steps', 600, type=int)
+    planets = request.args.get('planets', 40, type=int)
+    if steps < 0 or planets < 0:
+        raise ValueError("steps and planets can't be negative")
+    return {
+        'steps': min(steps, MAX_STEPS),
+        'planets': min(planets, MAX_PLANETS),
+        'seed': request.args.get('seed', 0, type=int),
+        'preset': preset,
+    }
+
+def view_params():
+    # ?points=N downsamples to N samples; ?start=&end= (seconds) zooms into a window
+    points = request.args.get('points', type=int)
+    if points is not None and not 3 <= points <= MAX_POINTS:
+        raise ValueError(f"points must be between 3 and {MAX_POINTS}")
+    return points, request.args.get('start', type=float), request.args.get('end', type=float)
+
+def series_response(result):
+    # Raw float arrays when the client asks for them (Accept header or
+    # ?format=binary, with ?precision=64 for doubles); JSON otherwise
+    wanted = request.accept_mimetypes.best_match(['application/json', binary.MIMETYPE])
+    if request.args.get('format') == 'binary' or wanted == binary.MIMETYPE:
+        precision = request.args.get('precision', 32, type=int)
+        if precision not in (32, 64):
+            raise ValueError("precision must be 32 or 64")
+        response = Response(binary.encode_series(result, precision), mimetype=binary.MIMETYPE)
+    else:
+        response = jsonify(result)
+    response.vary.add('Accept')
+    return response
+
+@app.errorhandler(ValueError)
+def bad_request(error):
+    return jsonify({"error": str(error)}), 400
+
 @app.route('/')
 def index():
     return render_template('index.html')
 
+@app.errorhandler(QueueFull)
+def queue_full(error):
+    response = jsonify({"error": str(error)})
+    response.headers['Retry-After'] = '5'
+    return response, 429
+
 @app.route('/simulate')
 def simulate():
-    # Run your simulation
-    result = planet.run_simulation()  # Adjust based on your script
-    # Assuming 'result' is serializable (e.g., dict, list)
-    return jsonify(result)
+    # Run the headless simulation; no pygame or display needed
+    params = simulation_params()
+    points, start, end = view_params()
+    if request.args.get('async', type=int):
+        return submit_job(params)
+    result = result_cache.get(params)
+    if result is None:
+        result = simulation.run_simulation(**params)
+        result_cache.put(params, result)
+    if points is not None or start is not None or end is not None:
+        result = downsample(result, points, start, end)  # The cache keeps full resolution
+    return series_response(result)
+
+@app.route('/simulate/stream')
+def simulate_stream():
+    # Newline-delimited JSON: one line per chunk of samples, sent as soon as
+    # it is computed, so memory per request stays flat however long the run
+    # With ?points=N each chunk is thinned to its share of N samples
+    params = simulation_params()
+    points, _, _ = view_params()
+    cached = result_cache.get(params)
+
+    def thin(chunk):
+        share = max(3, round(points * len(chunk["time"]) / max(1, params['steps'] + 1)))
+        keep = lttb(chunk["time"], chunk["mass"], share)
+        return dict(chunk, time=[chunk["time"][i] for i in keep], mass=[chunk["mass"][i] for i in keep])
+
+    def generate():
+        if cached is not None:
+            yield json.dumps(cached if points is None else downsample(cached, points)) + '\n'
+            return
+        result = {"time": [], "mass": []} if params['steps'] < CACHEABLE_SAMPLES else None
+        for chunk in simulation.iter_simulation(**params):
+            if result is not None:
+                result["time"].extend(chunk["time"])
+                result["mass"].extend(chunk["mass"])
+                result["absorbed"], result["merged"] = chunk["absorbed"], chunk["merged"]
+            yield json.dumps(chunk if points is None else thin(chunk)) + '\n'
+        if result is not None:
+            result_cache.put(params, result)
+
+    return Response(stream_with_context(generate()), mimetype='application/x-ndjson')
+
+def trajectory_path(params):
+    # Runs are deterministic, so a trajectory written once serves every later request
+    path = os.path.join(TRAJECTORY_DIR, cache_key(params) + '.traj')
+    if not os.path.exists(path):
+        if params['steps'] * params['planets'] > MAX_TRAJECTORY_WORK:
+            raise ValueError(f"trajectories are limited to steps x planets <= {MAX_TRAJECTORY_WORK}")
+        os.makedirs(TRAJECTORY_DIR, exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=TRAJECTORY_DIR, suffix='.tmp')
+        os.close(fd)
+        try:
+            simulation.run_simulation(**params, trajectory=tmp)
+            os.replace(tmp, path)
+        finally:
+            if os.path.exists(tmp):
+                os.remove(tmp)
+    return path
+
+@app.route('/simulate/trajectory')
+def simulate_trajectory():
+    # Per-body positions for frames start:stop, thinned to at most max_frames
+    params = simulation_params()
+    max_frames = min(request.args.get('max_frames', 200, type=int), MAX_TRAJECTORY_FRAMES)
+    if max_frames < 1:
+        raise ValueError("max_frames must be positive")
+    columns = request.args.get('columns', ','.join(TRAJECTORY_COLUMNS)).split(',')
+    unknown = set(columns) - set(simulation.trajectory.COLUMNS)
+    if unknown:
+        raise ValueError(f"unknown columns {sorted(unknown)}")
+
+    reader = simulation.TrajectoryReader(trajectory_path(params))
+    start, stop, _ = slice(request.args.get('start', 0, type=int),
+                           request.args.get('stop', type=int)).indices(len(reader))
+    stride = max(1, math.ceil((stop - start) / max_frames))
+    data = reader.read(start, stop, stride, columns)
+    return jsonify(dict({name: values.tolist() for name, values in data.items()},
+                        frames=len(reader), start=start, stop=stop, stride=stride))
+
+def submit_job(params):
+    cached = result_cache.get(params)
+    job = job_queue.add_finished(params, cached) if cached is not None else job_queue.submit(params)
+    response = jsonify(job.describe())
+    response.headers['Location'] = url_for('job_status', job_id=job.id)
+    return response, 202
+
+def get_job(job_id):
+    job = job_queue.get(job_id)
+    if job is None:
+        abort(404)
+    return job
+
+@app.route('/jobs/<job_id>')
+def job_status(job_id):
+    return jsonify(get_job(job_id).describe())
+
+@app.route('/jobs/<job_id>/result')
+def job_result(job_id):
+    # Partial while the job runs; pass ?start=N to fetch only samples from N on
+    return jsonify(get_job(job_id).samples(request.args.get('start', 0, type=int)))
+
+@app.route('/jobs/<job_id>', methods=['DELETE'])
+@app.route('/jobs/<job_id>/cancel', methods=['POST'])
+def job_cancel(job_id):
+    get_job(job_id)
+    return jsonify(job_queue.cancel(job_id).describe())
+
+@app.route('/jobs')
+def job_stats():
+    return jsonify(job_queue.stats())
+
+@app.route('/cache/stats')
+def cache_stats():
+    return jsonify(result_cache.stats())
 
 if __name__ == '__main__':
     app.run(debug=True)
-
@@ -0,0 +1,75 @@
+"""Barnes-Hut against direct summation for mutual planet gravity.
+
+    python -m bench.gravity --sizes 1000 10000 100000 --thetas 0.3 0.5 0.8
+
+For each body count the direct sum is evaluated on a sample of target bodies
+(``--sample``) and its full cost is extrapolated, so the 100k case finishes.
+Errors are relative to the direct acceleration of the sampled bodies.
+"""
+import argparse
+import json
+import time
+
+import numpy as np
+
+from simulation import WINDOW_SIZE, barnes_hut_accelerations, direct_accelerations, planet_mass
+
+
+def make_bodies(n, seed=0):
+    rng = np.random.default_rng(seed)
+    x = rng.uniform(0, WINDOW_SIZE[0], n)
+    y = rng.uniform(0, WINDOW_SIZE[1], n)
+    mass = planet_mass(rng.uniform(5, 30, n))
+    return x, y, mass
+
+
+def run(sizes, thetas, sample=500, seed=0):
+    rows = []
+    for n in sizes:
+        x, y, mass = make_bodies(n, seed)
+        targets = np.linspace(0, n - 1, min(sample, n)).astype(np.intp)
+
+        start = time.perf_counter()
+        exact_x, exact_y = direct_accelerations(x, y, mass, targets=targets)
+        direct_time = (time.perf_counter() - start) * n / len(targets)
+        exact = np.hypot(exact_x, exact_y)
+
+        for theta in thetas:
+            start = time.perf_counter()
+            ax, ay = barnes_hut_accelerations(x, y, mass, theta)
+            tree_time = time.perf_counter() - start
+            error = np.hypot(ax[targets] - exact_x, ay[targets] - exact_y) / exact
+            rows.append({
+                "bodies": n,
+                "theta": theta,
+                "barnes_hut_s": tree_time,
+                "direct_s": direct_time,
+                "speedup": direct_time / tree_time,
+                "median_error": float(np.median(error)),
+                "p99_error": float(np.percentile(error, 99)),
+            })
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 10000, 100000])
+    parser.add_argument("--thetas", type=float, nargs="+", default=[0.3, 0.5, 0.8])
+    parser.add_argument("--sample", type=int, default=500, help="target bodies for the direct reference")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--json", action="store_true", help="print JSON instead of a table")
+    args = parser.parse_args()
+
+    rows = run(args.sizes, args.thetas, args.sample, args.seed)
+    if args.json:
+        print(json.dumps(rows, indent=2))
+        return
+
+    print(f"{'bodies':>8} {'theta':>6} {'BH (s)':>9} {'direct (s)':>11} {'speedup':>8} {'median err':>11} {'p99 err':>9}")
+    for row in rows:
+        print(f"{row['bodies']:>8} {row['theta']:>6.2f} {row['barnes_hut_s']:>9.3f} {row['direct_s']:>11.3f} "
+              f"{row['speedup']:>8.1f} {row['median_error']:>11.2e} {row['p99_error']:>9.2e}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,129 @@
+"""Parallel physics step: equivalence and scaling across worker counts.
+
+    python -m bench.parallel --bodies 1000000 --per-worker 100000
+
+First checks that ``ParallelSimulation`` leaves every body exactly as
+``Simulation.step`` does (compared by planet id) and exits with status 1
+if not. Then times ``--steps`` parallel steps for each worker count:
+
+* strong scaling: ``--bodies`` bodies whatever the worker count, with the
+  speedup over the single-process ``Simulation.step`` on the same bodies;
+* weak scaling: ``--per-worker`` bodies per worker, with the efficiency
+  relative to one worker (1.0 is perfect).
+
+Worker counts default to powers of two up to the machine's core count;
+counts beyond it still run but can't show a speedup.
+"""
+import argparse
+import json
+import os
+import sys
+
+import numpy as np
+
+from simulation import ParallelSimulation
+
+from .physics import make_simulation
+from .timing import median_time, metric
+
+STRONG_BODIES = 1000000
+WEAK_BODIES = 100000
+
+
+def worker_counts(cores=None):
+    cores = cores or os.cpu_count()
+    counts = [1]
+    while counts[-1] * 2 <= cores:
+        counts.append(counts[-1] * 2)
+    if counts[-1] != cores:
+        counts.append(cores)
+    return counts
+
+
+def _by_id(sim):
+    store = sim.store
+    n = store.count
+    order = np.argsort(store.body_id[:n])
+    return {name: getattr(store, name)[:n][order] for name in store._columns() if name != "slot"}
+
+
+def equivalent(bodies=5000, steps=30, workers=2, collisions=True, seed=0):
+    """Whether a parallel run ends with every body as a single-process one."""
+    serial = make_simulation(bodies, collisions, seed)
+    for _ in range(steps):
+        serial.step()
+    sim = make_simulation(bodies, collisions, seed)
+    with ParallelSimulation(sim, workers) as parallel:
+        for _ in range(steps):
+            parallel.step()
+    expected, actual = _by_id(serial), _by_id(sim)
+    return (serial.absorbed, serial.merged) == (sim.absorbed, sim.merged) and all(
+        np.array_equal(expected[name], actual[name]) for name in expected)
+
+
+def time_parallel(bodies, workers, collisions, steps, repeat, seed=0):
+    # Workers start and bodies are scattered outside the timed region
+    opened = []
+
+    def setup():
+        opened.append(ParallelSimulation(make_simulation(bodies, collisions, seed), workers))
+        return opened[-1]
+
+    try:
+        return median_time(lambda parallel: parallel.step(), setup=setup, repeat=repeat, number=steps)
+    finally:
+        for parallel in opened:
+            parallel.close()
+
+
+def run(bodies=STRONG_BODIES, per_worker=WEAK_BODIES, workers=None, steps=5, repeat=3, collisions=True, seed=0):
+    workers = workers or worker_counts()
+    rows = []
+    serial = median_time(lambda sim: sim.step(), setup=lambda: make_simulation(bodies, collisions, seed),
+                         repeat=repeat, number=steps)
+    for count in workers:
+        seconds = time_parallel(bodies, count, collisions, steps, repeat, seed)
+        rows.append(metric(f"parallel.strong.{count}", 1000 * seconds, "ms", bodies=bodies, workers=count,
+                           collisions=collisions, serial_ms=1000 * serial, speedup=serial / seconds,
+                           efficiency=serial / seconds / count))
+    single = None
+    for count in workers:
+        seconds = time_parallel(per_worker * count, count, collisions, steps, repeat, seed)
+        single = single or seconds
+        rows.append(metric(f"parallel.weak.{count}", 1000 * seconds, "ms", bodies=per_worker * count, workers=count,
+                           collisions=collisions, efficiency=single / seconds))
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--bodies", type=int, default=STRONG_BODIES, help="bodies for strong scaling")
+    parser.add_argument("--per-worker", type=int, default=WEAK_BODIES, help="bodies per worker for weak scaling")
+    parser.add_argument("--workers", type=int, nargs="+", help="worker counts (default: powers of two up to the cores)")
+    parser.add_argument("--steps", type=int, default=5)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--no-collisions", dest="collisions", action="store_false")
+    parser.add_argument("--json", action="store_true", help="print JSON instead of a table")
+    args = parser.parse_args()
+
+    workers = args.workers or worker_counts()
+    for count in sorted(set(workers) - {1}) or [2]:
+        if not equivalent(workers=count, collisions=args.collisions):
+            print(f"parallel step with {count} workers differs from Simulation.step", file=sys.stderr)
+            sys.exit(1)
+
+    rows = run(args.bodies, args.per_worker, workers, args.steps, args.repeat, args.collisions)
+    if args.json:
+        print(json.dumps(rows, indent=2))
+        return
+    print(f"{os.cpu_count()} cores; single process {rows[0]['params']['serial_ms']:.3f} ms/step "
+          f"at {args.bodies} bodies")
+    for row in rows:
+        params = row["params"]
+        speedup = f"x{params['speedup']:.2f}" if "speedup" in params else ""
+        print(f"{row['name']:<24} {row['value']:>10.3f} {row['unit']:<3} {params['bodies']:>9} bodies "
+              f"{speedup:>7}  efficiency {params['efficiency']:.2f}")
+
+
+if __name__ == "__main__":
+    main()
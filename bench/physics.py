@@ -0,0 +1,72 @@
+"""Physics step cost against body count.
+
+    python -m bench.physics --sizes 10 100 1000 10000 100000
+
+Each round starts from the same scattered bodies (small radii, so most
+survive the first steps) and times ``--steps`` calls of ``Simulation.step``
+(more for small counts, where one step is too quick to time reliably),
+with and without planet collisions. The same step is also timed at 10k
+bodies with ``--holes`` black holes in the gravity field.
+"""
+import argparse
+import json
+import math
+import random
+
+from simulation import Simulation, populate
+
+from .timing import median_time, metric
+
+SIZES = [10, 100, 1000, 10000, 100000]
+HOLES = [1, 4, 16]
+
+
+def make_simulation(n, collisions, seed=0, holes=1):
+    sim = Simulation("planet", trail_length=0, collisions=collisions)
+    width, height = sim.window_size
+    for i in range(1, holes):
+        # Extra holes on a ring around the central one
+        angle = 2 * math.pi * i / (holes - 1)
+        sim.add_black_hole(width / 2 + 400 * math.cos(angle), height / 2 + 400 * math.sin(angle))
+    populate(sim, n, random.Random(seed), min_radius=0.5, max_radius=1.5)
+    return sim
+
+
+def run(sizes=SIZES, steps=5, repeat=3, seed=0, holes=HOLES):
+    rows = []
+    for n in sizes:
+        for collisions in (False, True):
+            seconds = median_time(
+                lambda sim: sim.step(),
+                setup=lambda: make_simulation(n, collisions, seed),
+                repeat=repeat,
+                number=max(steps, 1000 // n),
+            )
+            name = f"physics.step.{'collisions' if collisions else 'plain'}.{n}"
+            rows.append(metric(name, 1000 * seconds, "ms", bodies=n, collisions=collisions))
+    for count in holes:
+        seconds = median_time(lambda sim: sim.step(), setup=lambda: make_simulation(10000, False, seed, count),
+                              repeat=repeat, number=steps)
+        rows.append(metric(f"physics.step.holes.{count}", 1000 * seconds, "ms", bodies=10000, holes=count))
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=SIZES)
+    parser.add_argument("--steps", type=int, default=5)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--holes", type=int, nargs="+", default=HOLES)
+    parser.add_argument("--json", action="store_true", help="print JSON instead of a table")
+    args = parser.parse_args()
+
+    rows = run(args.sizes, args.steps, args.repeat, holes=args.holes)
+    if args.json:
+        print(json.dumps(rows, indent=2))
+        return
+    for row in rows:
+        print(f"{row['name']:<40} {row['value']:>10.3f} {row['unit']}")
+
+
+if __name__ == "__main__":
+    main()
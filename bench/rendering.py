@@ -0,0 +1,72 @@
+"""Trail/glow drawing per quality level and the PlanetGameV2 background.
+
+    python -m bench.rendering --planets 200
+
+Runs on SDL's dummy video driver unless SDL_VIDEODRIVER is already set, so
+no window is needed. Trails are filled by stepping the simulation first;
+then only ``Renderer.draw`` is timed.
+"""
+import argparse
+import json
+import os
+import random
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+
+from game.background import GalaxyBackground
+from game.renderer import QUALITY_LEVELS, Renderer
+from simulation import WINDOW_SIZE, populate
+
+from .timing import median_time, metric
+
+PALETTE = [(236, 37, 37), (41, 247, 72), (46, 63, 231), (255, 84, 180)]
+
+
+def make_renderer(planets, quality, neon, seed=0):
+    renderer = Renderer("planet", PALETTE, neon=neon, quality=quality, seed=seed)
+    populate(renderer.sim, planets, random.Random(seed), max_speed=2)
+    for planet in renderer.sim.planets:
+        planet.color = renderer.rng.choice(PALETTE)
+    for _ in range(renderer.sim.trail_length):
+        renderer.sim.step()
+    return renderer
+
+
+def run(planets=200, frames=60, repeat=3, seed=0):
+    rows = []
+    for quality in QUALITY_LEVELS:
+        for neon in (False, True):
+            renderer = make_renderer(planets, quality, neon, seed)
+            seconds = median_time(lambda _: renderer.draw(), repeat=repeat, number=frames)
+            style = "neon" if neon else "plain"
+            rows.append(metric(f"render.{style}.{quality}", 1000 * seconds, "ms",
+                               planets=len(renderer.sim.planets), quality=quality, neon=neon))
+
+    def background_frame(galaxy):
+        galaxy.update()
+        galaxy.draw(renderer.screen)
+
+    seconds = median_time(background_frame, setup=lambda: GalaxyBackground(WINDOW_SIZE, random.Random(seed)),
+                          repeat=repeat, number=frames)
+    rows.append(metric("render.galaxy_background", 1000 * seconds, "ms"))
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--planets", type=int, default=200)
+    parser.add_argument("--frames", type=int, default=60)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--json", action="store_true", help="print JSON instead of a table")
+    args = parser.parse_args()
+
+    rows = run(args.planets, args.frames, args.repeat)
+    if args.json:
+        print(json.dumps(rows, indent=2))
+        return
+    for row in rows:
+        print(f"{row['name']:<40} {row['value']:>10.3f} {row['unit']}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,149 @@
+"""Run the benchmark suite and compare it against a stored baseline.
+
+    python -m bench.suite --out results.json
+    python -m bench.suite --only physics web --update-baseline
+    python -m bench.suite --only --sessions heavy.rec
+
+Every benchmark reports metrics named like ``physics.step.plain.1000``.
+A metric regresses when it is worse than the baseline by more than its
+threshold: the longest matching name prefix in the baseline's
+``thresholds``, or ``default``. Exits with status 1 on any regression.
+Recorded game sessions (see ``game.replay``) passed with ``--sessions``
+are replayed at full speed as ``replay.<file name>`` metrics.
+Baselines are machine-specific; regenerate them with ``--update-baseline``
+on the machine that runs the comparison. ``--quick`` runs smaller
+workloads under the same metric names, so it is a smoke run only: nothing
+is compared against (or stored as) the baseline.
+"""
+import argparse
+import json
+import os
+import platform
+import sys
+
+BASELINE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "baseline.json")
+DEFAULT_THRESHOLDS = {"default": 0.25, "web.": 0.5}  # The web numbers are the noisiest
+
+
+def run_gravity(quick):
+    from . import gravity
+    from .timing import metric
+    rows = gravity.run([10000] if quick else [10000, 100000], [0.5], sample=200)
+    return [metric(f"gravity.barnes_hut.{row['bodies']}", 1000 * row["barnes_hut_s"], "ms",
+                   bodies=row["bodies"], theta=row["theta"]) for row in rows]
+
+
+def run_physics(quick):
+    from . import physics
+    return physics.run([10, 1000, 10000] if quick else physics.SIZES, holes=[1, 4] if quick else physics.HOLES)
+
+
+def run_parallel(quick):
+    from . import parallel
+    if quick:
+        return parallel.run(bodies=20000, per_worker=10000, steps=3, repeat=1)
+    return parallel.run()
+
+
+def run_rendering(quick):
+    from . import rendering
+    return rendering.run(planets=50 if quick else 200, frames=20 if quick else 60)
+
+
+def run_web(quick):
+    from . import web
+    return web.run(requests=10 if quick else 40)
+
+
+def run_sessions(paths, repeat=3):
+    from game.replay import replay
+    from .timing import median_time, metric
+    rows = []
+    for path in paths:
+        seconds = median_time(lambda _: replay(path), repeat=repeat)
+        rows.append(metric(f"replay.{os.path.basename(path)}", 1000 * seconds, "ms", path=path))
+    return rows
+
+
+BENCHMARKS = {
+    "gravity": run_gravity,
+    "physics": run_physics,
+    "parallel": run_parallel,
+    "rendering": run_rendering,
+    "web": run_web,
+}
+
+
+def threshold_for(name, thresholds):
+    matches = [prefix for prefix in thresholds if prefix != "default" and name.startswith(prefix)]
+    return thresholds[max(matches, key=len)] if matches else thresholds.get("default", 0.25)
+
+
+def compare(rows, baseline):
+    """Each metric with its baseline value, relative change and verdict."""
+    thresholds = baseline.get("thresholds", DEFAULT_THRESHOLDS)
+    reference = baseline.get("results", {})
+    report = []
+    for row in rows:
+        old = reference.get(row["name"])
+        if old is None:
+            report.append(dict(row, baseline=None, change=None, status="new"))
+            continue
+        change = (row["value"] - old) / old if old else 0.0
+        worse = -change if row["higher_is_better"] else change
+        limit = threshold_for(row["name"], thresholds)
+        status = "regressed" if worse > limit else "improved" if worse < -limit else "ok"
+        report.append(dict(row, baseline=old, change=change, threshold=limit, status=status))
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--only", nargs="*", choices=sorted(BENCHMARKS), default=list(BENCHMARKS))
+    parser.add_argument("--sessions", nargs="+", default=[], help="game recordings to replay as benchmarks")
+    parser.add_argument("--quick", action="store_true", help="smaller sizes, for a fast smoke run")
+    parser.add_argument("--baseline", default=BASELINE)
+    parser.add_argument("--out", help="write the results and comparison to this JSON file")
+    parser.add_argument("--update-baseline", action="store_true", help="store these results as the baseline")
+    args = parser.parse_args()
+    if args.quick and args.update_baseline:
+        parser.error("--quick results can't be stored as the baseline")
+
+    rows = []
+    for name in args.only:
+        print(f"running {name}...", file=sys.stderr)
+        rows.extend(BENCHMARKS[name](args.quick))
+    rows.extend(run_sessions(args.sessions))
+
+    baseline = {}
+    if os.path.exists(args.baseline):
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+    if args.quick:  # Smaller workloads than the baseline's, so not comparable
+        report = [dict(row, baseline=None, change=None, status="quick") for row in rows]
+    else:
+        report = compare(rows, baseline)
+
+    for row in report:
+        change = "" if row["change"] is None else f"{100 * row['change']:+7.1f}%"
+        print(f"{row['name']:<40} {row['value']:>10.3f} {row['unit']:<6} {change:>9}  {row['status']}")
+
+    machine = {"python": platform.python_version(), "machine": platform.machine(), "processor": platform.processor()}
+    if args.out:
+        with open(args.out, "w") as f:
+            json.dump({"machine": machine, "quick": args.quick, "results": report}, f, indent=2)
+    if args.update_baseline:
+        results = dict(baseline.get("results", {}))
+        results.update({row["name"]: row["value"] for row in rows})
+        with open(args.baseline, "w") as f:
+            json.dump({"machine": machine, "thresholds": baseline.get("thresholds", DEFAULT_THRESHOLDS),
+                       "results": results}, f, indent=2, sort_keys=True)
+            f.write("\n")
+        return
+
+    if any(row["status"] == "regressed" for row in report):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
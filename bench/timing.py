@@ -0,0 +1,23 @@
+import time
+
+import numpy as np
+
+
+def median_time(run, setup=None, repeat=5, number=1):
+    """Median seconds per call of ``run(state)`` over ``repeat`` rounds.
+
+    ``setup()`` builds fresh state for each round outside the timed region,
+    and ``run`` is called ``number`` times per round.
+    """
+    times = []
+    for _ in range(repeat):
+        state = setup() if setup is not None else None
+        start = time.perf_counter()
+        for _ in range(number):
+            run(state)
+        times.append((time.perf_counter() - start) / number)
+    return float(np.median(times))
+
+
+def metric(name, value, unit, higher_is_better=False, **params):
+    return {"name": name, "value": value, "unit": unit, "higher_is_better": higher_is_better, "params": params}
@@ -0,0 +1,106 @@
+"""``/simulate`` throughput under gunicorn.
+
+    python -m bench.web --workers 2 --clients 4 --requests 40
+
+Starts ``gunicorn app:app`` on a free local port, then sends requests from
+``--clients`` threads. Uncached runs use a different seed per request so
+every one is simulated; cached runs repeat one parameter set.
+"""
+import argparse
+import json
+import os
+import socket
+import subprocess
+import sys
+import time
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+from .timing import metric
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def start_server(port, workers, timeout=30):
+    env = dict(os.environ, SIM_CACHE_DIR="")  # Keep each run's cache in memory only
+    server = subprocess.Popen(
+        [sys.executable, "-m", "gunicorn", "-w", str(workers), "-b", f"127.0.0.1:{port}", "app:app"],
+        cwd=ROOT, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+    )
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            urllib.request.urlopen(f"http://127.0.0.1:{port}/cache/stats", timeout=1).read()
+            return server
+        except OSError:
+            if server.poll() is not None:
+                break
+            time.sleep(0.1)
+    server.kill()
+    raise RuntimeError("gunicorn did not start; is it installed?")
+
+
+def fetch(url):
+    start = time.perf_counter()
+    with urllib.request.urlopen(url, timeout=120) as response:
+        response.read()
+    return time.perf_counter() - start
+
+
+def load(base, requests, clients, steps, planets, cached):
+    urls = [f"{base}/simulate?steps={steps}&planets={planets}&seed={0 if cached else i}" for i in range(requests)]
+    if cached:
+        fetch(urls[0])  # Warm the cache
+    start = time.perf_counter()
+    with ThreadPoolExecutor(clients) as pool:
+        latencies = list(pool.map(fetch, urls))
+    return requests / (time.perf_counter() - start), np.array(latencies)
+
+
+def run(workers=2, clients=4, requests=40, steps=600, planets=40):
+    port = free_port()
+    server = start_server(port, workers)
+    rows = []
+    try:
+        for cached in (False, True):
+            throughput, latencies = load(f"http://127.0.0.1:{port}", requests, clients, steps, planets, cached)
+            kind = "cached" if cached else "uncached"
+            params = dict(workers=workers, clients=clients, steps=steps, planets=planets)
+            rows.append(metric(f"web.simulate.{kind}.throughput", throughput, "req/s", higher_is_better=True,
+                               **params))
+            rows.append(metric(f"web.simulate.{kind}.p99", 1000 * float(np.percentile(latencies, 99)), "ms",
+                               **params))
+    finally:
+        server.terminate()
+        server.wait()
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--workers", type=int, default=2)
+    parser.add_argument("--clients", type=int, default=4)
+    parser.add_argument("--requests", type=int, default=40)
+    parser.add_argument("--steps", type=int, default=600)
+    parser.add_argument("--planets", type=int, default=40)
+    parser.add_argument("--json", action="store_true", help="print JSON instead of a table")
+    args = parser.parse_args()
+
+    rows = run(args.workers, args.clients, args.requests, args.steps, args.planets)
+    if args.json:
+        print(json.dumps(rows, indent=2))
+        return
+    for row in rows:
+        print(f"{row['name']:<40} {row['value']:>10.3f} {row['unit']}")
+
+
+if __name__ == "__main__":
+    main()
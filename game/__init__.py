@@ -0,0 +1 @@
+"""Pygame front-end shared by ``planet.py``, ``PlanetGame.py`` and ``PlanetGameV2.py``."""
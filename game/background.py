@@ -0,0 +1,194 @@
+from collections import OrderedDict
+
+import numpy as np
+import pygame
+
+BASE_COLOR = (10, 10, 30)  # Dark blue as base color for the galaxy
+NEBULA_COLORS = [
+    (100, 50, 150), (50, 100, 150),
+    (100, 0, 150), (255, 255, 0),
+    (0, 0, 255), (0, 255, 0),
+    (255, 0, 0), (0, 0, 128), (255, 255, 255),
+]
+
+# Pixels covered by pygame.draw.circle for star sizes 1 and 2, relative to the centre
+_STAR_SHAPES = {
+    1: [(-1, -1), (0, -1), (-1, 0), (0, 0)],
+    2: [(-1, -2), (0, -2)] + [(dx, dy) for dy in (-1, 0) for dx in (-2, -1, 0, 1)] + [(-1, 1), (0, 1)],
+}
+
+
+class GalaxyBackground:
+    """Drifting stars and nebulae, composited into one cached layer.
+
+    Stars and nebulae live in NumPy arrays and move in one vectorized step
+    per frame. The base color and stars are kept in ``star_layer``, where
+    only stars that moved onto a different pixel are erased and restamped.
+    Nebula sprites are rendered once per (color, size bucket, opacity level)
+    with the opacity baked into the pixels, which blits several times faster
+    than a surface-wide alpha. Opacities are rounded to ``opacity_step`` and
+    only the ``max_sprites`` most recently used sprites are kept, since
+    every respawned nebula may draw a new key.
+
+    Everything is composited into ``layer``, which is rebuilt at most every
+    ``refresh_every`` frames and only when a star or nebula landed on a
+    different pixel. The drift is slow enough that this is invisible, and
+    most frames the whole background is a single blit.
+
+    ``set_density`` draws only a share of the stars and nebulae, for
+    cheaper frames at lower quality; the hidden ones keep drifting.
+    """
+
+    def __init__(self, window_size, rng, star_count=300, nebula_count=20, size_bucket=4, refresh_every=4,
+                 opacity_step=10, max_sprites=128):
+        self.window_size = window_size
+        self.rng = rng
+        self.size_bucket = size_bucket
+        self.refresh_every = refresh_every
+        self.opacity_step = opacity_step
+        self.max_sprites = max_sprites
+        self.star_layer = pygame.Surface(window_size)
+        self.star_layer.fill(BASE_COLOR)
+        self.layer = pygame.Surface(window_size)
+        self.nebula_sprites = OrderedDict()
+        self.redraws = 0
+        self.frame = 0
+        self._stamped = None  # Star pixel positions currently on the star layer
+        self._signature = None
+        self.visible_stars = star_count
+        self.visible_nebulae = nebula_count
+
+        width, height = window_size
+        self.star_x = np.array([rng.randint(0, width) for _ in range(star_count)], dtype=float)
+        self.star_y = np.array([rng.randint(0, height) for _ in range(star_count)], dtype=float)
+        self.star_size = np.array([rng.choice([1, 2]) for _ in range(star_count)])
+        self.star_brightness = np.array([rng.randint(150, 255) for _ in range(star_count)])  # Slightly varied
+        self.star_speed = np.array([rng.uniform(0.02, 0.1) for _ in range(star_count)])  # Very slow movement
+
+        self.nebula_x = np.zeros(nebula_count)
+        self.nebula_y = np.zeros(nebula_count)
+        self.nebula_size = np.zeros(nebula_count)
+        self.nebula_color = np.zeros(nebula_count, dtype=int)
+        self.nebula_opacity = np.zeros(nebula_count, dtype=int)
+        self.nebula_growth = np.zeros(nebula_count)
+        self.nebula_vx = np.zeros(nebula_count)
+        self.nebula_vy = np.zeros(nebula_count)
+        for i in range(nebula_count):
+            self.reset_nebula(i)
+
+    def reset_nebula(self, i):
+        rng = self.rng
+        self.nebula_x[i] = rng.randint(0, self.window_size[0])
+        self.nebula_y[i] = rng.randint(0, self.window_size[1])
+        self.nebula_size[i] = rng.randint(50, 150)
+        self.nebula_color[i] = rng.randrange(len(NEBULA_COLORS))
+        self.nebula_opacity[i] = rng.randint(50, 100)
+        self.nebula_growth[i] = rng.choice([-0.1, 0.1])  # Randomly grow or shrink
+        self.nebula_vx[i] = rng.uniform(-0.5, 0.5)  # Left-right movement
+        self.nebula_vy[i] = rng.uniform(-0.5, 0.5)  # Up-down movement
+
+    def update(self):
+        width, height = self.window_size
+
+        # Stars move slowly downwards and wrap around to the top
+        self.star_y += self.star_speed
+        for i in np.flatnonzero(self.star_y > height):
+            self.star_y[i] = 0
+            self.star_x[i] = self.rng.randint(0, width)
+
+        # Nebulae slowly change size, reversing out of bounds, and drift
+        self.nebula_size += self.nebula_growth
+        bounce = (self.nebula_size < 50) | (self.nebula_size > 150)
+        self.nebula_growth[bounce] *= -1
+        self.nebula_x += self.nebula_vx
+        self.nebula_y += self.nebula_vy
+        gone = ((self.nebula_x < -150) | (self.nebula_x > width + 150)
+                | (self.nebula_y < -150) | (self.nebula_y > height + 150))
+        for i in np.flatnonzero(gone):
+            self.reset_nebula(i)  # Respawn somewhere else
+
+    def set_density(self, fraction):
+        stars = int(round(fraction * len(self.star_x)))
+        nebulae = int(round(fraction * len(self.nebula_x)))
+        if (stars, nebulae) == (self.visible_stars, self.visible_nebulae):
+            return
+        self.visible_stars, self.visible_nebulae = stars, nebulae
+        # Restamp the star layer from scratch and recomposite on the next draw
+        self.star_layer.fill(BASE_COLOR)
+        self._stamped = None
+        self._signature = None
+
+    def nebula_sprite(self, color_index, size, opacity):
+        opacity = int(round(opacity / self.opacity_step)) * self.opacity_step
+        key = (color_index, size, opacity)
+        sprite = self.nebula_sprites.get(key)
+        if sprite is not None:
+            self.nebula_sprites.move_to_end(key)
+            return sprite
+        sprite = pygame.Surface((size * 2, size * 2), pygame.SRCALPHA)
+        pygame.draw.circle(sprite, (*NEBULA_COLORS[color_index], opacity), (size, size), size)
+        self.nebula_sprites[key] = sprite
+        if len(self.nebula_sprites) > self.max_sprites:
+            self.nebula_sprites.popitem(last=False)
+        return sprite
+
+    def _paint_stars(self, pixels, x, y, sizes, colors):
+        width, height = self.window_size
+        for size, shape in _STAR_SHAPES.items():
+            chosen = sizes == size
+            sx, sy, color = x[chosen], y[chosen], colors[chosen]
+            for dx, dy in shape:
+                px, py = sx + dx, sy + dy
+                inside = (px >= 0) & (px < width) & (py >= 0) & (py < height)
+                pixels[px[inside], py[inside]] = color[inside]
+
+    def _update_stars(self):
+        count = self.visible_stars
+        x = self.star_x[:count].astype(int)
+        y = self.star_y[:count].astype(int)
+        sizes = self.star_size[:count]
+        if self._stamped is not None:
+            old_x, old_y = self._stamped
+            moved = (x != old_x) | (y != old_y)
+            if not moved.any():
+                return
+        pixels = pygame.surfarray.pixels3d(self.star_layer)
+        if self._stamped is not None:
+            # Erase the stars that moved, then restamp all of them in case they overlapped
+            base = np.broadcast_to(np.asarray(BASE_COLOR), (int(moved.sum()), 3))
+            self._paint_stars(pixels, old_x[moved], old_y[moved], sizes[moved], base)
+        # Blend each star's brightness over the base color
+        base = np.asarray(BASE_COLOR)
+        colors = base + (255 - base) * self.star_brightness[:count, None] // 255
+        self._paint_stars(pixels, x, y, sizes, colors)
+        del pixels  # Unlock the surface
+        self._stamped = (x, y)
+
+    def _nebula_sizes(self):
+        sizes = self.nebula_size[:self.visible_nebulae]
+        return (np.round(sizes / self.size_bucket) * self.size_bucket).astype(int)
+
+    def _composite(self):
+        self._update_stars()
+        self.layer.blit(self.star_layer, (0, 0))
+        sizes = self._nebula_sizes()
+        self.layer.blits([
+            (self.nebula_sprite(int(self.nebula_color[i]), int(sizes[i]), int(self.nebula_opacity[i])),
+             (int(self.nebula_x[i]) - sizes[i], int(self.nebula_y[i]) - sizes[i]))
+            for i in range(len(sizes))
+        ], doreturn=False)
+        self.redraws += 1
+
+    def draw(self, screen):
+        if self._signature is None or self.frame % self.refresh_every == 0:
+            stars, nebulae = self.visible_stars, self.visible_nebulae
+            signature = np.concatenate([
+                self.star_x[:stars].astype(int), self.star_y[:stars].astype(int),
+                self.nebula_x[:nebulae].astype(int), self.nebula_y[:nebulae].astype(int),
+                self._nebula_sizes(), self.nebula_color[:nebulae],
+            ])
+            if self._signature is None or not np.array_equal(signature, self._signature):
+                self._composite()
+                self._signature = signature
+        self.frame += 1
+        screen.blit(self.layer, (0, 0))
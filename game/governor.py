@@ -0,0 +1,67 @@
+from collections import deque
+
+FRAME_BUDGET = 1 / 60  # Seconds of work per frame to hold 60 FPS
+
+
+class QualityGovernor:
+    """Steps through quality levels to keep frame work within a budget.
+
+    ``update`` takes each frame's work time (everything but the wait for the
+    frame cap) and averages it over the last ``window`` frames. Quality drops
+    a level as soon as a full window averages over ``budget``, but only rises
+    one after ``recovery`` frames in a row averaged under ``headroom`` times
+    the budget, so it doesn't flicker between two levels. If a raised level
+    has to be dropped again straight away, the recovery time doubles, up to
+    ``max_recovery`` frames.
+    """
+
+    def __init__(self, levels, budget=FRAME_BUDGET, start=None, window=30, headroom=0.7, recovery=120,
+                 max_recovery=1920):
+        self.levels = list(levels)  # Lowest quality first
+        self.index = len(self.levels) - 1 if start is None else self.levels.index(start)
+        self.budget = budget
+        self.headroom = headroom
+        self.recovery = recovery
+        self.max_recovery = max_recovery
+        self.samples = deque(maxlen=window)
+        self.frames = 0
+        self.calm = 0  # Consecutive frames with room to spare
+        self.changes = []  # (frame, level) for every change, for logs and profile dumps
+        self._raised_at = None
+
+    @property
+    def level(self):
+        return self.levels[self.index]
+
+    @property
+    def average(self):
+        # Mean work time over the window in seconds
+        return sum(self.samples) / len(self.samples) if self.samples else 0.0
+
+    def update(self, seconds):
+        """Record one frame's work time; returns the new level if it changed, else None."""
+        self.frames += 1
+        self.samples.append(seconds)
+        if len(self.samples) < self.samples.maxlen:
+            return None
+        average = self.average
+        if average > self.budget and self.index > 0:
+            if self._raised_at is not None and self.frames - self._raised_at <= 2 * self.samples.maxlen:
+                self.recovery = min(2 * self.recovery, self.max_recovery)
+            return self._change(-1)
+        if average < self.headroom * self.budget and self.index < len(self.levels) - 1:
+            self.calm += 1
+            if self.calm >= self.recovery:
+                self._raised_at = self.frames
+                return self._change(1)
+        else:
+            self.calm = 0
+        return None
+
+    def _change(self, step):
+        # Start a fresh window so the new level is judged on its own frames
+        self.index += step
+        self.samples.clear()
+        self.calm = 0
+        self.changes.append((self.frames, self.level))
+        return self.level
@@ -0,0 +1,189 @@
+"""Physics on a worker thread, handing finished frames to the renderer.
+
+The ``Simulation`` belongs to the ``PhysicsThread``: it steps in real time
+on its own fixed-timestep loop, applies input the main thread sends through
+a lock-free queue, and after stepping copies what the renderer needs into
+one of two ``FrameState`` buffers. The main thread only ever reads the
+most recently published buffer, so a slow frame no longer holds up (or
+drops) physics steps and the two overlap.
+
+The overlap is limited by the GIL: Python code on either thread still
+runs one at a time, but NumPy work, SDL drawing and the display flip
+release it.
+"""
+import threading
+import time
+from collections import deque, namedtuple
+
+import numpy as np
+
+from game.replay import apply_event
+from simulation import FPS, ParticleStore, Planet
+
+MAX_CATCHUP_TICKS = 10  # Ticks one iteration may run when physics itself falls behind
+
+HoleState = namedtuple("HoleState", "x y radius accretion_disk_radius")
+
+
+class FrameState:
+    """A copy of the simulation's drawable state after one step.
+
+    ``planets`` are ``Planet`` views onto the frame's own ``store`` and
+    ``black_holes`` are ``HoleState`` tuples, so the renderer can draw a
+    frame exactly as it draws a live ``Simulation``.
+    """
+
+    def __init__(self):
+        self.store = ParticleStore(trail_length=0)
+        self.planets = []
+        self.black_holes = []
+        self.frame = 0
+        self.accumulator = 0.0  # Ticks left over after the frame's last step
+        self.dt = 1.0
+        self.published = 0.0  # perf_counter() when it was published
+
+    def copy_from(self, sim):
+        source, store = sim.store, self.store
+        n = source.count
+        if store.trail_length != source.trail_length:
+            store.set_trail_length(source.trail_length)
+        if store.capacity < n:
+            store._grow(max(n, 2 * store.capacity))
+        planets = self.planets
+        del planets[n:]
+        planets.extend(Planet(store, i, 0) for i in range(len(planets), n))  # Before the copy sets their ids
+        for name in source._columns():
+            np.copyto(getattr(store, name)[:n], getattr(source, name)[:n])
+        store.count = n
+        for view, planet in zip(planets, sim.planets):
+            view.color = planet.color
+        self.black_holes = [HoleState(hole.x, hole.y, hole.radius, hole.accretion_disk_radius)
+                            for hole in sim.black_holes]
+        self.frame = sim.frame
+        self.dt = sim.dt
+
+    def alpha(self, now):
+        # How far between the frame's last two steps to draw, advancing with wall time
+        return min(1.0, (self.accumulator + (now - self.published) * FPS) / self.dt)
+
+
+class StateBuffers:
+    """Two ``FrameState`` buffers: the front one for reading, the back one for writing.
+
+    The lock only guards swapping which buffer is which, never the copying
+    or drawing. The physics thread skips publishing while the renderer
+    still holds the back buffer (it was the front one when the frame
+    began) instead of waiting for it.
+    """
+
+    def __init__(self):
+        self.buffers = [FrameState(), FrameState()]
+        self.front = 0
+        self.ready = False  # Nothing to read until the first publish
+        self.reading = None
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        # Render thread: the latest published frame, held until release
+        with self._lock:
+            if not self.ready:
+                return None
+            self.reading = self.front
+            return self.buffers[self.front]
+
+    def release(self):
+        with self._lock:
+            self.reading = None
+
+    def back(self):
+        # Physics thread: the buffer to write, or None while it is being drawn
+        with self._lock:
+            back = 1 - self.front
+            return None if self.reading == back else self.buffers[back]
+
+    def publish(self):
+        with self._lock:
+            self.front = 1 - self.front
+            self.ready = True
+
+
+class PhysicsThread(threading.Thread):
+    """Steps ``sim`` in real time and publishes each result to ``buffers``.
+
+    Input is queued with ``send`` and applied (and recorded, if there is a
+    ``recorder``) before the next steps; ``call`` queues any function of the
+    simulation, such as saving a snapshot. An exception on the thread is
+    kept in ``error`` and stops it.
+    """
+
+    def __init__(self, sim, rng, palette, recorder=None):
+        super().__init__(name="physics", daemon=True)
+        self.sim = sim
+        self.rng = rng
+        self.palette = palette
+        self.recorder = recorder
+        self.buffers = StateBuffers()
+        self.inbox = deque()  # append and popleft are atomic, so no lock is needed
+        self.steps = 0
+        self.error = None
+        self._stopping = False
+
+    def send(self, kind, button=0, x=0, y=0):
+        self.inbox.append((kind, button, x, y))
+
+    def call(self, function):
+        self.inbox.append(function)
+
+    def stop(self):
+        self._stopping = True
+        self.join()
+
+    def _drain(self):
+        sim, recorder = self.sim, self.recorder
+        while self.inbox:
+            item = self.inbox.popleft()
+            if callable(item):
+                item(sim)
+                continue
+            if recorder is not None:
+                recorder.event(*item)
+            apply_event(sim, self.rng, self.palette, *item)
+
+    def run(self):
+        try:
+            self._loop()
+        except Exception as error:
+            self.error = error
+
+    def _loop(self):
+        sim = self.sim
+        accumulator = 0.0
+        previous = time.perf_counter()
+        stale = True  # The state has changed since it was last published
+        while not self._stopping:
+            now = time.perf_counter()
+            accumulator = min(accumulator + (now - previous) * FPS, MAX_CATCHUP_TICKS)
+            previous = now
+
+            had_input = bool(self.inbox)
+            self._drain()
+            steps = 0
+            while accumulator >= sim.dt:
+                sim.step()
+                accumulator -= sim.dt
+                steps += 1
+            self.steps += steps
+            stale = stale or steps or had_input
+            if self.recorder is not None and (steps or self.recorder.events):
+                self.recorder.frame(time.perf_counter() - now, steps)
+
+            back = self.buffers.back() if stale else None
+            if back is not None:
+                back.copy_from(sim)
+                back.accumulator = accumulator
+                back.published = now
+                self.buffers.publish()
+                stale = False
+
+            # Sleep until the next step is due
+            time.sleep(max(0.0, (sim.dt - accumulator) / FPS))
@@ -0,0 +1,125 @@
+import csv
+import json
+import time
+from collections import deque
+from contextlib import contextmanager
+
+import numpy as np
+
+# Histogram bins for whole-run timings: log-spaced from 10 µs to 1 s
+HISTOGRAM_EDGES = np.logspace(-5, 0, 101)
+
+
+class FrameProfiler:
+    """Per-phase frame timings for the game loop.
+
+    Wrap each part of a frame in ``with profiler.phase(name):`` between
+    ``begin_frame`` and ``end_frame``. The last ``window`` frames are kept
+    for the HUD's rolling percentiles, and every frame also goes into a
+    fixed log-spaced histogram so a whole session can be summarised by
+    ``dump`` in bounded memory.
+    """
+
+    def __init__(self, window=600):
+        self.window = window
+        self.frames = 0
+        self.frame_times = deque(maxlen=window)
+        self.phase_times = {}  # Phase name -> deque of seconds per frame
+        self.histograms = {"frame": np.zeros(len(HISTOGRAM_EDGES) + 1, dtype=np.int64)}
+        self.totals = {"frame": 0.0}
+        self.bodies = 0
+        self._current = {}
+        self._frame_start = None
+
+    def begin_frame(self):
+        now = time.perf_counter()
+        if self._frame_start is not None:
+            self._record("frame", now - self._frame_start)
+            self.frame_times.append(now - self._frame_start)
+        self._frame_start = now
+        self._current = {}
+
+    def end_frame(self, bodies=0):
+        # Phases that didn't run this frame count as zero so the windows stay aligned
+        self.bodies = bodies
+        for name in list(self.phase_times) + [name for name in self._current if name not in self.phase_times]:
+            if name not in self.phase_times:
+                self.phase_times[name] = deque([0.0] * len(self.frame_times), maxlen=self.window)
+            seconds = self._current.get(name, 0.0)
+            self.phase_times[name].append(seconds)
+            self._record(name, seconds)
+        self.frames += 1
+
+    @contextmanager
+    def phase(self, name):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self._current[name] = self._current.get(name, 0.0) + time.perf_counter() - start
+
+    def _record(self, name, seconds):
+        if name not in self.histograms:
+            self.histograms[name] = np.zeros(len(HISTOGRAM_EDGES) + 1, dtype=np.int64)
+            self.totals[name] = 0.0
+        self.histograms[name][np.searchsorted(HISTOGRAM_EDGES, seconds)] += 1
+        self.totals[name] += seconds
+
+    @property
+    def fps(self):
+        total = sum(self.frame_times)
+        return len(self.frame_times) / total if total else 0.0
+
+    def percentile(self, q, name=None):
+        """Rolling percentile in seconds of the frame time or of one phase."""
+        values = self.frame_times if name is None else self.phase_times.get(name, ())
+        return float(np.percentile(values, q)) if len(values) else 0.0
+
+    def mean(self, name):
+        values = self.phase_times.get(name, ())
+        return sum(values) / len(values) if values else 0.0
+
+    def _histogram_percentile(self, name, q):
+        counts = self.histograms[name]
+        total = counts.sum()
+        if not total:
+            return 0.0
+        # Upper edge of the bin holding the q-th percentile
+        index = int(np.searchsorted(np.cumsum(counts), q / 100 * total))
+        return float(HISTOGRAM_EDGES[min(index, len(HISTOGRAM_EDGES) - 1)])
+
+    def summary(self):
+        """Whole-run timings per phase in milliseconds."""
+        rows = {}
+        for name, counts in self.histograms.items():
+            samples = int(counts.sum())
+            rows[name] = {
+                "samples": samples,
+                "mean_ms": 1000 * self.totals[name] / samples if samples else 0.0,
+                "p50_ms": 1000 * self._histogram_percentile(name, 50),
+                "p99_ms": 1000 * self._histogram_percentile(name, 99),
+            }
+        return rows
+
+    def dump(self, path, **metadata):
+        """Write the summary to ``path``, as CSV if it ends in .csv and JSON otherwise."""
+        summary = self.summary()
+        if path.endswith(".csv"):
+            with open(path, "w", newline="") as f:
+                writer = csv.writer(f)
+                writer.writerow(["phase", "samples", "mean_ms", "p50_ms", "p99_ms"])
+                for name, row in summary.items():
+                    writer.writerow([name, row["samples"], row["mean_ms"], row["p50_ms"], row["p99_ms"]])
+            return
+        with open(path, "w") as f:
+            json.dump({"frames": self.frames, **metadata, "phases": summary}, f, indent=2)
+
+    def hud_lines(self, extra=()):
+        lines = [
+            f"FPS {self.fps:5.1f}   bodies {self.bodies}",
+            f"frame p50 {1000 * self.percentile(50):5.2f} ms   p99 {1000 * self.percentile(99):5.2f} ms",
+        ]
+        lines.extend(extra)
+        for name in self.phase_times:
+            lines.append(f"{name:<12}{1000 * self.mean(name):6.2f} ms   p99 {1000 * self.percentile(99, name):6.2f}")
+        return lines
@@ -0,0 +1,425 @@
+import os
+import random
+import shutil
+import sys
+import time
+
+import pygame
+from pygame.locals import K_F3, K_F5, KEYDOWN, QUIT, MOUSEBUTTONDOWN, MOUSEBUTTONUP, MOUSEMOTION
+
+from game.governor import FRAME_BUDGET, QualityGovernor
+from game.physics_thread import PhysicsThread
+from game.profiler import FrameProfiler
+from game.replay import MOUSE_DOWN, MOUSE_MOTION, MOUSE_UP, TRAIL_LENGTH, Recorder, apply_event
+from game.sprites import GlowSpriteCache
+from simulation import FPS, WINDOW_SIZE, Simulation
+from simulation.snapshot import load_snapshot, save_snapshot
+
+BACKGROUND_COLOR = (25, 25, 25)
+MAX_CATCHUP_TICKS = 10  # Physics ticks a single frame may run before falling behind real time
+FULL_UPDATE_FRACTION = 0.5  # Dirty-rect mode pushes the whole screen past this share of pixels
+HUD_COLOR = (230, 230, 230)
+HUD_BACKGROUND = (0, 0, 0, 160)
+DEFAULT_SNAPSHOT = "snapshot.dhs"
+HUD_REFRESH_FRAMES = 15  # Re-rendering the text every frame would cost more than it measures
+
+# Neon trail settings per front-end
+NEON_STYLES = {
+    "planet": {
+        "glow_layers": 6, "glow_offset": 4, "opacity_step": 10, "glow_fade": 30,
+        "line_width": 5, "outline_offset": 5, "outline_width": 3,
+    },
+    "PlanetGame": {
+        "glow_layers": 5, "glow_offset": 0, "opacity_step": 12, "glow_fade": 40,
+        "line_width": 3, "outline_offset": 3, "outline_width": 2,
+    },
+}
+NEON_STYLES["PlanetGameV2"] = NEON_STYLES["PlanetGame"]
+
+# Level of detail per quality level, lowest first: trail points kept per
+# planet, a glow sprite on every trail_step-th of them, at most glow_layers
+# glow layers (None keeps the style's), the share of background stars and
+# nebulae drawn, and the radius below which planets are drawn as plain discs
+QUALITY_SETTINGS = {
+    "minimal": {"trail_length": 4, "trail_step": 3, "glow_layers": 1, "background": 0.25, "small_body": 12},
+    "low": {"trail_length": 6, "trail_step": 2, "glow_layers": 2, "background": 0.5, "small_body": 8},
+    "medium": {"trail_length": 12, "trail_step": 2, "glow_layers": 3, "background": 0.75, "small_body": 5},
+    "high": {"trail_length": 20, "trail_step": 1, "glow_layers": None, "background": 1.0, "small_body": 0},
+}
+QUALITY_LEVELS = list(QUALITY_SETTINGS)
+TRAIL_LENGTHS = {name: settings["trail_length"] for name, settings in QUALITY_SETTINGS.items()}
+DEFAULT_QUALITY = "high"
+
+
+class Renderer:
+    """Pygame window, input handling and drawing for a ``Simulation``."""
+
+    def __init__(self, preset, palette, caption="Black Hole Absorption Simulation",
+                 disk_color=(150, 150, 150), disk_width=1, background=None, neon=True, max_fps=60,
+                 seed=None, quality=DEFAULT_QUALITY, dirty_rects=False, full_update_fraction=FULL_UPDATE_FRACTION,
+                 show_hud=False, profile_out=None, record=None, snapshot=None, background_density=None,
+                 adaptive_quality=False, frame_budget=FRAME_BUDGET, threaded=False, **simulation_options):
+        # Initialize Pygame
+        pygame.init()
+        self.clock = pygame.time.Clock()
+        pygame.display.set_caption(caption)
+
+        # Screen setup
+        self.screen = pygame.display.set_mode(WINDOW_SIZE)
+
+        # Start from snapshot (or $GAME_SNAPSHOT) if it exists; F5 saves the current state there
+        self.snapshot = snapshot or os.environ.get("GAME_SNAPSHOT")
+        resume = self.snapshot is not None and os.path.exists(self.snapshot)
+        simulation_options.setdefault("trail_length", TRAIL_LENGTHS[quality])
+        simulation_options.setdefault("near_substeps", 1)  # The games keep the original per-frame update
+        if resume:
+            self.sim = load_snapshot(self.snapshot)
+            for planet in self.sim.planets:
+                if planet.color is None:  # Saved by a headless run
+                    planet.color = palette[planet.planet_id % len(palette)]
+        else:
+            self.sim = Simulation(preset, **simulation_options)
+        self.max_fps = max_fps  # 0 renders as fast as the display allows
+        self.palette = palette
+
+        # Record the session's input to record (or $GAME_RECORD) for game.replay;
+        # a recording needs a known seed, so pick one if none was given
+        record = record or os.environ.get("GAME_RECORD")
+        if record and seed is None:
+            seed = random.randrange(2 ** 32)
+        self.rng = random.Random(seed)  # Planet colours; seed it for repeatable sessions
+        self.recorder = None
+        if record:
+            start = None
+            if resume:
+                # F5 overwrites the snapshot, so the recording keeps its own copy of the start
+                start = os.path.abspath(record) + ".start.dhs"
+                shutil.copyfile(self.snapshot, start)
+            self.recorder = Recorder(record, {
+                "preset": preset, "simulation": simulation_options, "palette": palette, "seed": seed,
+                "snapshot": start, "snapshot_digest": self.sim.digest() if resume else None,
+            })
+        self.disk_color = disk_color
+        self.disk_width = disk_width
+        self.background = background
+        self.background_density = background_density  # Called with the share of background detail to draw
+        self.neon_style = NEON_STYLES[preset] if neon else None
+        self._glow_caches = {}  # Glow layer count -> GlowSpriteCache
+        self.apply_quality(quality)
+        self.mouse_down = False
+
+        # With adaptive_quality (or $GAME_FRAME_BUDGET in ms) the governor
+        # steps quality up and down to keep each frame's work within budget
+        budget = os.environ.get("GAME_FRAME_BUDGET")
+        self.governor = None
+        if adaptive_quality or budget:
+            self.governor = QualityGovernor(QUALITY_LEVELS, float(budget) / 1000 if budget else frame_budget,
+                                            start=quality)
+
+        # Dirty-rect mode (or $GAME_DIRTY_RECTS=1) only works over a flat
+        # background; a background callable may repaint anywhere, so those
+        # frames are always full updates
+        dirty_rects = dirty_rects or os.environ.get("GAME_DIRTY_RECTS") == "1"
+        self.dirty_rects = dirty_rects and background is None
+        self.full_update_fraction = full_update_fraction
+        self.screen_rect = self.screen.get_rect()
+        self._drawn_rects = None  # Planet areas painted last frame; None forces a full redraw
+        self._black_hole_shape = None
+        self.update_fraction = 1.0  # Share of the screen pushed to the display by the last frame
+        self.pixels_updated = 0
+        self.pixels_total = 0
+
+        # Frame timings per phase; F3 toggles the HUD. Timings are written to
+        # profile_out (or $GAME_PROFILE), as CSV or JSON by extension, on exit.
+        self.preset = preset
+        self.profiler = FrameProfiler()
+        self.sim.profiler = self.profiler
+        self.show_hud = show_hud
+        self.profile_out = profile_out or os.environ.get("GAME_PROFILE")
+        self.hud_font = None
+        self.hud_panel = None
+
+        # With threaded (or $GAME_THREADED=1) physics steps on its own thread
+        # and frames are drawn from the state it last published
+        self.threaded = threaded or os.environ.get("GAME_THREADED") == "1"
+        self.physics = None
+        self.view = self.sim  # What draw() shows: the simulation or a published frame
+
+    def apply_quality(self, quality):
+        # Everything but the trail length, which is simulation state and recorded
+        self.quality = quality
+        settings = QUALITY_SETTINGS[quality]
+        if self.neon_style:
+            style = self.neon_style
+            layers = min(style["glow_layers"], settings["glow_layers"] or style["glow_layers"])
+            if layers not in self._glow_caches:
+                self._glow_caches[layers] = GlowSpriteCache(layers, style["glow_offset"], style["glow_fade"])
+            self.glow_sprites = self._glow_caches[layers]
+        if self.background_density:
+            self.background_density(settings["background"])
+
+    def set_quality(self, quality):
+        self.apply_quality(quality)
+        self.input(TRAIL_LENGTH, x=TRAIL_LENGTHS[quality])
+
+    def draw_neon_planet(self, planet, pos):
+        style = self.neon_style
+        screen = self.screen
+        # Draw a neon-like trail from cached glow sprites in one batched blit
+        trail = planet.trail  # View into the ring buffer, oldest point first
+        if len(trail) > 1:
+            newest = len(trail) - 2
+            radius = planet.radius
+            corners = trail[:-1].astype(int).tolist()
+            blits = []
+            step = QUALITY_SETTINGS[self.quality]["trail_step"]
+            for i in range(newest % step, newest + 1, step):  # Always keeps the newest point
+                tx, ty = corners[i]
+                # Older segments are dimmer
+                opacity = max(30, 255 - ((newest - i) * style["opacity_step"]))
+                sprite = self.glow_sprites.get(planet.color, radius, opacity)
+                half = sprite.get_width() // 2
+                blits.append((sprite, (tx - half, ty - half)))
+            rects = screen.blits(blits)
+
+            # Draw a thick, solid neon line along the trail path
+            rects.append(pygame.draw.lines(screen, planet.color, False, trail, style["line_width"]))
+
+        # Draw the planet with a slightly larger neon outline for more glow
+        outline = pygame.draw.circle(screen, (255, 255, 255), pos,
+                                     int(planet.radius + style["outline_offset"]), style["outline_width"])  # Outer glow
+        pygame.draw.circle(screen, planet.color, pos, int(planet.radius))
+        return outline.unionall(rects) if len(trail) > 1 else outline
+
+    def draw_planet(self, planet, alpha=1.0):
+        x, y = planet.interpolated(alpha)
+        pos = (int(x), int(y))
+        if planet.radius < QUALITY_SETTINGS[self.quality]["small_body"]:
+            # Small bodies are just a disc at lower quality
+            return pygame.draw.circle(self.screen, planet.color, pos, max(1, int(planet.radius)))
+        if self.neon_style:
+            return self.draw_neon_planet(planet, pos)
+
+        # Draw the trail as a line
+        rect = None
+        if len(planet.trail) > 1:
+            rect = pygame.draw.lines(self.screen, planet.color, False, planet.trail, 1)
+
+        # Draw the planet
+        body = pygame.draw.circle(self.screen, planet.color, pos, int(planet.radius))
+        return body.union(rect) if rect else body
+
+    def draw_black_hole(self, black_hole):
+        # Draw the black hole
+        pygame.draw.circle(self.screen, (0, 0, 0), (int(black_hole.x), int(black_hole.y)), int(black_hole.radius))
+
+        # Draw the accretion disk
+        return pygame.draw.circle(self.screen, self.disk_color, (int(black_hole.x), int(black_hole.y)),
+                                  int(black_hole.accretion_disk_radius), self.disk_width)
+
+    def draw_hud(self):
+        if self.hud_panel is None or self.profiler.frames % HUD_REFRESH_FRAMES == 0:
+            self.hud_panel = self.render_hud()
+        return self.screen.blit(self.hud_panel, (10, 10))
+
+    def render_hud(self):
+        if self.hud_font is None:
+            self.hud_font = pygame.font.Font(None, 20)
+        extra = [f"pixels updated {100 * self.update_fraction:5.1f}%"] if self.dirty_rects else []
+        if self.physics is not None:
+            extra.append(f"physics thread at step {self.physics.steps}, drawing step {self.view.frame}")
+        if self.governor is not None:
+            governor = self.governor
+            extra.append(f"quality {self.quality} (auto, work {1000 * governor.average:5.2f} / "
+                         f"{1000 * governor.budget:.1f} ms)")
+        lines = [self.hud_font.render(line, True, HUD_COLOR) for line in self.profiler.hud_lines(extra)]
+        height = lines[0].get_height()
+        panel = pygame.Surface((max(line.get_width() for line in lines) + 12, height * len(lines) + 8),
+                               pygame.SRCALPHA)
+        panel.fill(HUD_BACKGROUND)
+        for i, line in enumerate(lines):
+            panel.blit(line, (6, 4 + i * height))
+        return panel
+
+    def draw_scene(self, alpha):
+        # Planets, black hole and HUD; returns the rects painted for planets and HUD
+        phase = self.profiler.phase
+        with phase("planets"):
+            drawn = [self.draw_planet(planet, alpha) for planet in self.view.planets]
+        with phase("black_hole_draw"):
+            for hole in self.view.black_holes:
+                self.draw_black_hole(hole)
+        if self.show_hud:
+            with phase("hud"):
+                drawn.append(self.draw_hud())
+        return drawn
+
+    def draw(self, alpha=1.0):
+        # alpha is how far the renderer is between the last two physics steps
+        # A grown black hole (or the first frame) needs a full redraw
+        if (self.dirty_rects and self._drawn_rects is not None
+                and self.black_hole_shape() == self._black_hole_shape):
+            self.draw_dirty(alpha)
+            return
+        with self.profiler.phase("background"):
+            if self.background:
+                self.background(self.screen)
+            else:
+                self.screen.fill(BACKGROUND_COLOR)  # Fill the background
+        drawn = self.draw_scene(alpha)
+        with self.profiler.phase("display"):
+            pygame.display.update()
+        self._drawn_rects = drawn
+        self._black_hole_shape = self.black_hole_shape()
+        self._count_update(self.screen_rect.width * self.screen_rect.height)
+
+    def draw_dirty(self, alpha=1.0):
+        # Erase only where planets were painted last frame, redraw, and push
+        # the old and new areas; the rest of the screen is left untouched
+        screen = self.screen
+        with self.profiler.phase("background"):
+            for rect in self._drawn_rects:
+                screen.fill(BACKGROUND_COLOR, rect)
+        drawn = self.draw_scene(alpha)  # The black hole repaints whatever of it was erased
+
+        dirty = self._drawn_rects + drawn
+        dirty = [rect.clip(self.screen_rect) for rect in dirty]
+        area = sum(rect.width * rect.height for rect in dirty)  # Overlaps counted twice; errs towards full
+        total = self.screen_rect.width * self.screen_rect.height
+        with self.profiler.phase("display"):
+            if area >= self.full_update_fraction * total:
+                pygame.display.update()
+                area = total
+            else:
+                pygame.display.update(dirty)
+        self._drawn_rects = drawn
+        self._count_update(area)
+
+    def black_hole_shape(self):
+        return [(int(hole.x), int(hole.y), int(hole.radius), int(hole.accretion_disk_radius))
+                for hole in self.view.black_holes]
+
+    def _count_update(self, area):
+        total = self.screen_rect.width * self.screen_rect.height
+        self.update_fraction = min(1.0, area / total)
+        self.pixels_updated += min(area, total)
+        self.pixels_total += total
+
+    @property
+    def average_update_fraction(self):
+        # Share of all pixels pushed to the display since the window opened
+        return self.pixels_updated / self.pixels_total if self.pixels_total else 1.0
+
+    def dump_profile(self):
+        if self.profile_out:
+            changes = self.governor.changes if self.governor is not None else []
+            self.profiler.dump(self.profile_out, preset=self.preset, quality=self.quality,
+                               dirty_rects=self.dirty_rects,
+                               average_update_fraction=self.average_update_fraction, quality_changes=changes)
+
+    def input(self, kind, button=0, x=0, y=0):
+        # Everything that changes the simulation goes through here so it can be recorded
+        if self.physics is not None:
+            self.physics.send(kind, button, x, y)  # Applied and recorded on the physics thread
+            return
+        if self.recorder is not None:
+            self.recorder.event(kind, button, x, y)
+        apply_event(self.sim, self.rng, self.palette, kind, button, x, y)
+
+    def handle_event(self, event):
+        if event.type == QUIT:
+            if self.physics is not None:
+                self.physics.stop()
+            self.dump_profile()
+            if self.recorder is not None:
+                self.recorder.close(self.sim)
+            pygame.quit()
+            sys.exit()
+        elif event.type == KEYDOWN and event.key == K_F3:
+            self.show_hud = not self.show_hud
+        elif event.type == KEYDOWN and event.key == K_F5:
+            path = self.snapshot or DEFAULT_SNAPSHOT
+            if self.physics is not None:
+                self.physics.call(lambda sim: save_snapshot(sim, path))
+            else:
+                save_snapshot(self.sim, path)
+        elif event.type == MOUSEBUTTONDOWN:
+            self.mouse_down = True
+            self.input(MOUSE_DOWN, event.button, *event.pos)
+        elif event.type == MOUSEBUTTONUP:
+            self.mouse_down = False
+            self.input(MOUSE_UP, event.button, *event.pos)
+        elif event.type == MOUSEMOTION:
+            self.input(MOUSE_MOTION, 0, *event.pos)
+
+    def run(self):
+        # Fixed-timestep loop: physics always advances in steps of sim.dt ticks
+        # (1 tick = 1/60 s) however fast frames are drawn
+        if self.threaded:
+            self.run_threaded()
+            return
+        accumulator = 0.0
+        previous = time.perf_counter()
+        profiler = self.profiler
+        quality = None  # The governor's pick, applied as the next frame's input
+        while True:
+            profiler.begin_frame()
+            now = time.perf_counter()
+            accumulator = min(accumulator + (now - previous) * FPS, MAX_CATCHUP_TICKS)
+            previous = now
+
+            with profiler.phase("events"):
+                for event in pygame.event.get():
+                    self.handle_event(event)
+                # Applied with this frame's input, before its steps, as replay applies it
+                if quality is not None:
+                    self.set_quality(quality)
+                    quality = None
+
+            # The simulation times its own phases (bodies, gravity, black_hole)
+            steps = 0
+            while accumulator >= self.sim.dt:
+                self.sim.step()
+                accumulator -= self.sim.dt
+                steps += 1
+
+            self.draw(accumulator / self.sim.dt)
+            if self.governor is not None:
+                # Judge the frame's own work, not the wait for the frame cap
+                quality = self.governor.update(time.perf_counter() - now)
+            with profiler.phase("idle"):
+                self.clock.tick(self.max_fps)
+            profiler.end_frame(bodies=len(self.sim.planets))
+            if self.recorder is not None:
+                self.recorder.frame(time.perf_counter() - now, steps)
+
+    def run_threaded(self):
+        # Physics steps on its own thread (see game.physics_thread); this loop
+        # only handles events and draws the latest frame it published
+        self.sim.profiler = None  # The profiler isn't thread-safe; frames only time drawing
+        self.physics = PhysicsThread(self.sim, self.rng, self.palette, self.recorder)
+        self.physics.start()
+        profiler = self.profiler
+        while True:
+            profiler.begin_frame()
+            now = time.perf_counter()
+            with profiler.phase("events"):
+                for event in pygame.event.get():
+                    self.handle_event(event)
+            if self.physics.error is not None:
+                raise self.physics.error
+
+            frame = self.physics.buffers.acquire()
+            if frame is not None:
+                try:
+                    self.view = frame
+                    self.draw(frame.alpha(time.perf_counter()))
+                finally:
+                    self.physics.buffers.release()
+            if self.governor is not None:
+                level = self.governor.update(time.perf_counter() - now)
+                if level is not None:
+                    self.set_quality(level)
+            with profiler.phase("idle"):
+                self.clock.tick(self.max_fps)
+            profiler.end_frame(bodies=len(frame.planets) if frame is not None else 0)
@@ -0,0 +1,163 @@
+"""Record a game session's input and replay it headless with identical state.
+
+    python -m game.replay session.rec [--realtime] [--repeat 3]
+
+A recording is a JSON header followed by one binary record per frame: the
+frame's wall time, how many physics steps it ran, and the input events
+applied before those steps. Physics depends only on that input and the
+colour seed, so replaying the records reproduces every planet exactly; the
+file ends with a digest of the final state that ``replay`` checks.
+"""
+import argparse
+import json
+import random
+import struct
+import time
+
+from simulation import Simulation
+from simulation.snapshot import load_snapshot
+
+MAGIC = b"DHREC"
+VERSION = 2  # 2: the state digest covers body ids and slots
+
+# Event kinds
+MOUSE_DOWN = 1
+MOUSE_UP = 2
+MOUSE_MOTION = 3
+TRAIL_LENGTH = 4  # x holds the new trail length
+
+_LENGTH = struct.Struct("<I")
+_FRAME = struct.Struct("<fHH")  # Wall seconds, physics steps, event count
+_EVENT = struct.Struct("<BBhh")  # Kind, button, x, y
+_END = 0xFFFF  # Event count marking the final digest record
+
+
+class ReplayMismatch(Exception):
+    """Raised when a replay doesn't end in the recorded state."""
+
+
+def apply_event(sim, rng, palette, kind, button, x, y):
+    """Apply one input event to ``sim`` exactly as the game loop does."""
+    if kind == MOUSE_DOWN:
+        if button == 1:  # Left mouse button
+            sim.add_planet(x, y, 10, color=rng.choice(palette))
+    elif kind == MOUSE_UP:
+        sim.release()
+    elif kind == MOUSE_MOTION:
+        sim.mouse_pos = (x, y)
+    elif kind == TRAIL_LENGTH:
+        sim.set_trail_length(x)
+
+
+def _clamp(value):
+    return max(-32768, min(32767, int(value)))
+
+
+class Recorder:
+    """Writes the input of a running session to ``path``.
+
+    ``header`` holds everything needed to rebuild the simulation: the
+    preset, ``Simulation`` keyword arguments, palette and colour seed, and
+    the snapshot the session started from, if any (a copy kept next to the
+    recording, since the game may overwrite the original) and its digest.
+    """
+
+    def __init__(self, path, header):
+        self.file = open(path, "wb")
+        encoded = json.dumps(dict(header, version=VERSION)).encode()
+        self.file.write(MAGIC + _LENGTH.pack(len(encoded)) + encoded)
+        self.events = []
+        self.frames = 0
+
+    def event(self, kind, button=0, x=0, y=0):
+        self.events.append(_EVENT.pack(kind, button, _clamp(x), _clamp(y)))
+
+    def frame(self, seconds, steps):
+        self.file.write(_FRAME.pack(seconds, steps, len(self.events)) + b"".join(self.events))
+        self.events = []
+        self.frames += 1
+
+    def close(self, sim):
+        if self.file.closed:
+            return
+        if self.events:  # Input handled in the same frame as the quit
+            self.frame(0.0, 0)
+        self.file.write(_FRAME.pack(0.0, 0, _END) + bytes.fromhex(sim.digest()))
+        self.file.close()
+
+
+def read_recording(path):
+    """The header, a list of ``(seconds, steps, events)`` frames and the final digest."""
+    with open(path, "rb") as f:
+        data = f.read()
+    if not data.startswith(MAGIC):
+        raise ValueError(f"{path} is not a session recording")
+    offset = len(MAGIC)
+    (length,) = _LENGTH.unpack_from(data, offset)
+    offset += _LENGTH.size
+    header = json.loads(data[offset:offset + length])
+    if header.get("version") != VERSION:
+        raise ValueError(f"unsupported recording version {header.get('version')}")
+    offset += length
+
+    frames = []
+    digest = None
+    while offset < len(data):
+        seconds, steps, count = _FRAME.unpack_from(data, offset)
+        offset += _FRAME.size
+        if count == _END:
+            digest = data[offset:offset + 32].hex()
+            break
+        events = [_EVENT.unpack_from(data, offset + i * _EVENT.size) for i in range(count)]
+        offset += count * _EVENT.size
+        frames.append((seconds, steps, events))
+    return header, frames, digest
+
+
+def replay(path, realtime=False, profiler=None):
+    """Replay a recording headless and return the final ``Simulation``.
+
+    With ``realtime`` each frame takes at least as long as it did when
+    recorded; otherwise frames run back to back. Raises ``ReplayMismatch``
+    if the final state differs from the recorded one.
+    """
+    header, frames, digest = read_recording(path)
+    if header.get("snapshot"):
+        sim = load_snapshot(header["snapshot"])
+        if header.get("snapshot_digest") not in (None, sim.digest()):
+            raise ReplayMismatch(f"{path}: {header['snapshot']} no longer holds the recorded starting state")
+    else:
+        sim = Simulation(header["preset"], **header["simulation"])
+    sim.profiler = profiler
+    rng = random.Random(header["seed"])
+    palette = [tuple(color) for color in header["palette"]]
+    for seconds, steps, events in frames:
+        start = time.perf_counter()
+        for event in events:
+            apply_event(sim, rng, palette, *event)
+        for _ in range(steps):
+            sim.step()
+        if realtime:
+            time.sleep(max(0.0, seconds - (time.perf_counter() - start)))
+    if digest is not None and sim.digest() != digest:
+        raise ReplayMismatch(f"{path}: final state differs from the recording")
+    return sim
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("path")
+    parser.add_argument("--realtime", action="store_true", help="pace frames as they were recorded")
+    parser.add_argument("--repeat", type=int, default=1, help="replay several times and report each")
+    args = parser.parse_args()
+
+    for _ in range(args.repeat):
+        start = time.perf_counter()
+        sim = replay(args.path, args.realtime)
+        elapsed = time.perf_counter() - start
+        print(f"{sim.frame} steps in {elapsed:.3f} s ({sim.frame / elapsed:.0f} steps/s), "
+              f"{len(sim.planets)} planets, state {sim.digest()[:16]} ok")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,65 @@
+from collections import OrderedDict
+
+import pygame
+
+
+class GlowSpriteCache:
+    """Pre-rendered neon glow sprites keyed by (color, radius, opacity).
+
+    Each sprite is the stack of fading glow circles the neon trail used to
+    draw one ``pygame.draw.circle`` at a time, composited once onto an
+    SRCALPHA surface. Radii are rounded to ``radius_step`` pixels so growing
+    planets reuse sprites, and opacities to ``opacity_step`` levels so a long
+    trail's fade shares a handful of sprites instead of one per segment; the
+    least recently used sprites are dropped beyond ``maxsize``, which should
+    hold the working set (colours x radii x opacity levels) of a frame.
+    """
+
+    def __init__(self, glow_layers, glow_offset, glow_fade, radius_step=1, opacity_step=32, maxsize=4096):
+        self.glow_layers = glow_layers
+        self.glow_offset = glow_offset
+        self.glow_fade = glow_fade
+        self.radius_step = radius_step
+        self.opacity_step = opacity_step
+        self.maxsize = maxsize
+        self._sprites = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self):
+        return len(self._sprites)
+
+    def get(self, color, radius, opacity):
+        radius = max(1, int(round(radius / self.radius_step)) * self.radius_step)
+        opacity = min(255, max(self.opacity_step, int(round(opacity / self.opacity_step)) * self.opacity_step))
+        key = (color, radius, opacity)
+        sprite = self._sprites.get(key)
+        if sprite is not None:
+            self._sprites.move_to_end(key)
+            self.hits += 1
+            return sprite
+
+        self.misses += 1
+        sprite = self._render(color, radius, opacity)
+        self._sprites[key] = sprite
+        if len(self._sprites) > self.maxsize:
+            self._sprites.popitem(last=False)
+        return sprite
+
+    def _render(self, color, radius, opacity):
+        outer = max(1, radius + self.glow_offset)
+        size = outer * 2
+        sprite = pygame.Surface((size, size), pygame.SRCALPHA)
+        layer = pygame.Surface((size, size), pygame.SRCALPHA)
+
+        # Draw a glow effect by layering circles with reduced opacity; each
+        # layer is alpha-blended over the last so the centre ends up brightest
+        for j in range(self.glow_layers):
+            glow_radius = int(radius - j + self.glow_offset)
+            glow_opacity = max(0, opacity - j * self.glow_fade)  # Fades with each layer
+            if glow_radius <= 0 or glow_opacity == 0:
+                break
+            layer.fill((0, 0, 0, 0))
+            pygame.draw.circle(layer, (*color, glow_opacity), (outer, outer), glow_radius)
+            sprite.blit(layer, (0, 0))
+        return sprite
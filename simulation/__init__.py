@@ -0,0 +1,30 @@
+"""Headless black hole simulation core.
+
+Nothing in this package imports pygame, so the web app and batch tools can
+use it on machines without a display. The pygame front-ends render on top of
+the same ``Simulation``.
+"""
+from .core import (
+    DEFAULT_PRESET,
+    FPS,
+    G,
+    MASS_AREA_RATIO,
+    PRESETS,
+    WINDOW_SIZE,
+    BlackHole,
+    Simulation,
+    iter_simulation,
+    planet_mass,
+    populate,
+    run_simulation,
+    step_bodies,
+)
+from .collisions import SpatialHash, merge_overlapping
+from .events import AbsorptionLog
+from .field import GravityField
+from .gravity import QuadTree, barnes_hut_accelerations, direct_accelerations
+from .integrators import DEFAULT_INTEGRATOR, INTEGRATORS, integrate
+from .parallel import ParallelSimulation
+from .particles import ParticleStore, Planet
+from .snapshot import load_snapshot, read_snapshot, save_snapshot
+from .trajectory import TrajectoryReader, TrajectoryWriter
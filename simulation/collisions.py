@@ -0,0 +1,156 @@
+import numpy as np
+
+from .constants import MASS_AREA_RATIO
+
+# Half of the 3x3 neighbourhood, so each pair of cells is visited once
+_NEIGHBOUR_OFFSETS = ((1, -1), (1, 0), (1, 1), (0, 1))
+
+
+class SpatialHash:
+    """Uniform grid broad phase over the planets.
+
+    Cells are at least twice the largest radius, so any two touching bodies
+    sit in the same or in neighbouring cells. The grid is rebuilt from the
+    columns every step, which keeps it correct as planets grow (up to 200 px
+    while they are being created) without any bookkeeping.
+    """
+
+    def __init__(self, min_cell_size=1.0):
+        self.min_cell_size = min_cell_size
+        self.cell_size = min_cell_size
+        self.order = np.empty(0, dtype=np.intp)
+        self.sorted_keys = np.empty(0, dtype=np.int64)
+        self.keys = np.empty(0, dtype=np.int64)
+        self.stride = 1
+
+    def build(self, x, y, radius):
+        if len(x) == 0:
+            self.order = np.empty(0, dtype=np.intp)
+            self.sorted_keys = self.keys = np.empty(0, dtype=np.int64)
+            return
+        self.cell_size = max(2 * float(radius.max()), self.min_cell_size)
+        cx = np.floor(x / self.cell_size).astype(np.int64)
+        cy = np.floor(y / self.cell_size).astype(np.int64)
+
+        # Pad by one cell on each side so neighbour keys never wrap into another column
+        cx -= cx.min() - 1
+        cy -= cy.min() - 1
+        self.stride = int(cy.max()) + 2
+        self.keys = cx * self.stride + cy
+        self.order = np.argsort(self.keys, kind="stable")
+        self.sorted_keys = self.keys[self.order]
+
+    def candidate_pairs(self):
+        """Return index arrays ``(i, j)`` of bodies sharing or neighbouring a cell."""
+        n = len(self.keys)
+        positions = np.arange(n)
+        sorted_keys = self.sorted_keys
+
+        # Same cell: every body pairs with the ones after it in sorted order
+        starts = [positions + 1]
+        ends = [np.searchsorted(sorted_keys, sorted_keys, side="right")]
+        owners = [positions]
+        for ox, oy in _NEIGHBOUR_OFFSETS:
+            neighbour = sorted_keys + ox * self.stride + oy
+            starts.append(np.searchsorted(sorted_keys, neighbour, side="left"))
+            ends.append(np.searchsorted(sorted_keys, neighbour, side="right"))
+            owners.append(positions)
+
+        start = np.concatenate(starts)
+        counts = np.concatenate(ends) - start
+        owner = np.concatenate(owners)
+        total = int(counts.sum())
+        if total == 0:
+            empty = np.empty(0, dtype=np.intp)
+            return empty, empty
+
+        # Expand each (owner, start, count) run into individual pairs
+        first = np.repeat(owner, counts)
+        run_offsets = np.arange(total) - np.repeat(np.cumsum(counts) - counts, counts)
+        second = np.repeat(start, counts) + run_offsets
+        return self.order[first], self.order[second]
+
+    def overlapping_pairs(self, x, y, radius):
+        i, j = self.candidate_pairs()
+        dx = x[i] - x[j]
+        dy = y[i] - y[j]
+        reach = radius[i] + radius[j]
+        touching = dx * dx + dy * dy < reach * reach
+        return i[touching], j[touching]
+
+
+def _components(n, i, j):
+    # Label propagation: every body ends up labelled with the lowest index in
+    # its chain of overlapping bodies
+    labels = np.arange(n)
+    while True:
+        low = np.minimum(labels[i], labels[j])
+        updated = labels.copy()
+        np.minimum.at(updated, i, low)
+        np.minimum.at(updated, j, low)
+        updated = updated[updated]
+        if np.array_equal(updated, labels):
+            return labels
+        labels = updated
+
+
+def merge_overlapping(store, grid=None):
+    """Merge every group of touching, released planets into one body.
+
+    Mass and momentum are conserved: the heaviest planet in each group takes
+    the total mass (as area), the mass-weighted position and the combined
+    momentum; the others are marked dead for the next compaction. Returns the
+    number of planets merged away.
+    """
+    n = store.count
+    free = store.alive[:n] & ~store.creating[:n]
+    bodies = np.flatnonzero(free)
+    if len(bodies) < 2:
+        return 0
+
+    x, y = store.x[bodies], store.y[bodies]
+    radius = store.radius[bodies]
+    grid = grid or SpatialHash()
+    grid.build(x, y, radius)
+    i, j = grid.overlapping_pairs(x, y, radius)
+    return merge_pairs(store, bodies[i], bodies[j])
+
+
+def merge_pairs(store, i, j):
+    """Merge the groups of bodies linked by the touching row pairs ``(i, j)``.
+
+    The pairs may come from anywhere (``merge_overlapping`` or the tiles of
+    ``simulation.parallel``); the result only depends on which rows touch.
+    Returns the number of planets merged away.
+    """
+    if len(i) == 0:
+        return 0
+
+    # Label propagation over the involved rows only, numbered in row order
+    involved, pair_index = np.unique(np.concatenate([i, j]), return_inverse=True)
+    groups = _components(len(involved), pair_index[:len(i)], pair_index[len(i):])
+    mass = store.mass[involved]
+
+    # Sort by group, heaviest first, so the first row of each group survives
+    order = np.lexsort((-mass, groups))
+    rows, groups, mass = involved[order], groups[order], mass[order]
+    group_start = np.flatnonzero(np.r_[True, groups[1:] != groups[:-1]])
+
+    total_mass = np.add.reduceat(mass, group_start)
+    centre_x = np.add.reduceat(mass * store.x[rows], group_start) / total_mass
+    centre_y = np.add.reduceat(mass * store.y[rows], group_start) / total_mass
+    momentum_x = np.add.reduceat(mass * store.vx[rows], group_start)
+    momentum_y = np.add.reduceat(mass * store.vy[rows], group_start)
+
+    survivors = rows[group_start]
+    store.x[survivors] = centre_x
+    store.y[survivors] = centre_y
+    store.vx[survivors] = momentum_x / total_mass
+    store.vy[survivors] = momentum_y / total_mass
+    store.mass[survivors] = total_mass
+    store.radius[survivors] = np.sqrt(total_mass / (np.pi * MASS_AREA_RATIO))
+
+    merged = np.ones(len(rows), dtype=bool)
+    merged[group_start] = False
+    store.alive[rows[merged]] = False
+    return int(merged.sum())
@@ -0,0 +1,5 @@
+# Constants shared by the simulation modules
+WINDOW_SIZE = (1820, 1050)
+G = 6.67408e-11  # Gravitational Constant
+MASS_AREA_RATIO = 2e9  # mass in kilograms to area in pixels
+FPS = 60  # Physics steps per simulated second
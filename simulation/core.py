@@ -0,0 +1,443 @@
+import hashlib
+import math
+import random
+from contextlib import nullcontext
+
+import numpy as np
+
+from .collisions import SpatialHash, merge_overlapping
+from .constants import FPS, G, MASS_AREA_RATIO, WINDOW_SIZE
+from .events import AbsorptionLog
+from .field import GravityField
+from .gravity import apply_mutual_gravity
+from .integrators import DEFAULT_INTEGRATOR, INTEGRATORS, integrate, semi_implicit_euler
+from .particles import ParticleStore, Planet
+
+# Tuning constants used by each of the pygame front-ends. Layers are listed
+# from the innermost (strongest) pull outwards and scale with the black hole's
+# radius.
+PRESETS = {
+    "planet": {
+        "layer_scales": (100, 200, 400, 600),
+        "layer_multipliers": (1.3, 1.0, 0.8, 0.5),
+        "disk_damping": 0.95,
+        "disk_damping_slope": 0.3,
+        "outer_damping": 0.98,
+        "horizon_damping": 0.8,
+        "growth_factor": 1.009,
+        "throw_divisor": 2,
+    },
+    "PlanetGame": {
+        "layer_scales": (100, 200, 400, 600),
+        "layer_multipliers": (1.0, 0.8, 0.6, 0.45),
+        "disk_damping": 0.95,
+        "disk_damping_slope": 0.3,
+        "outer_damping": 0.98,
+        "horizon_damping": 0.8,
+        "growth_factor": 1.004,
+        "throw_divisor": 2,
+    },
+    "PlanetGameV2": {
+        "layer_scales": (90, 200, 500, 700),
+        "layer_multipliers": (0.9, 0.8, 0.6, 0.5),
+        "disk_damping": 0.90,
+        "disk_damping_slope": 0.25,
+        "outer_damping": 0.95,
+        "horizon_damping": 0.70,
+        "growth_factor": 1.009,
+        "throw_divisor": 1.5,
+    },
+}
+DEFAULT_PRESET = "planet"
+
+
+def planet_mass(radius):
+    return math.pi * (radius ** 2) * MASS_AREA_RATIO
+
+
+class BlackHole:
+    def __init__(self, x, y, radius, mass, layer_scales=(100, 200, 400, 600),
+                 layer_multipliers=(1.3, 1.0, 0.8, 0.5), disk_damping=0.95, disk_damping_slope=0.3, outer_damping=0.98,
+                 horizon_damping=0.8, growth_factor=1.009):
+        self.x = x
+        self.y = y
+        self.radius = radius
+        self.mass = mass
+        self.accretion_disk_radius = 3 * self.radius  # Initial accretion disk size
+        self.layer_scales = tuple(layer_scales)
+        self.layer_multipliers = tuple(layer_multipliers)
+        self.disk_damping = disk_damping
+        self.disk_damping_slope = disk_damping_slope
+        self.outer_damping = outer_damping
+        self.horizon_damping = horizon_damping
+        self.growth_factor = growth_factor
+        self.version = 0
+        self.refresh()
+
+    def refresh(self):
+        # Radial lookup table of the layered pull: layer radii scale with the
+        # hole, so they only change when it grows. Bumping ``version`` tells any
+        # GravityField holding this hole to restack its tables; call this after
+        # moving or resizing the hole by hand.
+        self.layer_radii = np.asarray(self.layer_scales, dtype=float) * self.radius
+        self.layer_table = np.append(self.layer_multipliers, 0)
+        self.version += 1
+
+    def acceleration(self, x, y):
+        """Pull of the hole on bodies at ``(x, y)``, in px per tick squared."""
+        dx = self.x - x
+        dy = self.y - y
+        distance = np.sqrt(dx * dx + dy * dy)
+
+        # Unit vector towards the hole; no trig needed
+        safe = np.where(distance > 0, distance, 1)
+        ux = np.where(distance > 0, dx / safe, 0)
+        uy = np.where(distance > 0, dy / safe, 0)
+
+        # Prevent division by zero near the center
+        clamped = np.maximum(distance, 1)
+
+        # Gravitational acceleration with multi-layer scaling (planet mass cancels)
+        acceleration = G * self.mass / (clamped ** 2) * self.get_pull_strength(clamped)
+        return ux * acceleration, uy * acceleration
+
+    def damping_at(self, x, y):
+        return self.get_damping(np.sqrt((self.x - x) ** 2 + (self.y - y) ** 2))
+
+    def near(self, x, y):
+        """Bodies within twice the hole's radius, which get finer steps."""
+        return np.sqrt((self.x - x) ** 2 + (self.y - y) ** 2) < self.radius * 2
+
+    def absorb(self, store, log=None, frame=0):
+        """Absorb every live planet within reach of the hole; see ``GravityField.absorb``."""
+        return GravityField([self]).absorb(store, log, frame)
+
+    def get_pull_strength(self, distance):
+        # Layers go from the innermost ("super event horizon") outwards; anything
+        # beyond the outermost layer gets no pull. Works on scalars and arrays.
+        return self.layer_table[np.searchsorted(self.layer_radii, distance)]
+
+    def get_damping(self, distance):
+        # Stronger damping effect as the planet gets closer to the black hole
+        damping_factor = np.where(
+            distance < self.accretion_disk_radius,
+            self.disk_damping - (distance / self.accretion_disk_radius) * self.disk_damping_slope,
+            self.outer_damping,  # Slow down slightly in outer layers
+        )
+
+        # Accelerate when close to event horizon for absorption
+        return np.where(
+            distance < self.radius * 2,
+            np.maximum(self.horizon_damping, damping_factor),  # Increase damping inside event horizon
+            damping_factor,
+        )
+
+    def grow(self, times=1):
+        # Increase the black hole's radius and mass by the growth factor, once
+        # per absorbed planet; the lookup table is refreshed once at the end.
+        # Returns the radius and mass after each growth, for the absorption log.
+        radii, masses = [], []
+        for _ in range(times):
+            self.radius *= self.growth_factor
+            self.mass *= self.growth_factor
+            radii.append(self.radius)
+            masses.append(self.mass)
+        self.accretion_disk_radius = 3 * self.radius  # Adjust accretion disk size to match growth
+        self.refresh()
+        return radii, masses
+
+
+def black_hole_options(settings):
+    # BlackHole keyword arguments from a preset's settings
+    names = ("layer_scales", "layer_multipliers", "disk_damping", "disk_damping_slope", "outer_damping",
+             "horizon_damping", "growth_factor")
+    return {name: settings[name] for name in names}
+
+
+class Simulation:
+    """A black hole and its planets, stepped one frame at a time.
+
+    Any keyword from ``PRESETS`` can be passed to override the preset value.
+    With ``mutual_gravity`` the planets also attract each other through a
+    Barnes-Hut quadtree with opening angle ``theta``. That pull is not part
+    of the acceleration the integrator evaluates: it is applied as one
+    operator-split kick of ``dt`` after the integrator has moved the bodies
+    (one tree per step instead of one per integrator stage), so body-body
+    forces are only first-order accurate even with ``verlet`` or ``rk4``,
+    which stay higher order for the black holes' pull alone.
+
+    Every ``step`` advances a fixed ``dt`` (in 60 Hz ticks) with the chosen
+    ``integrator`` from ``INTEGRATORS``; bodies within twice the hole's radius
+    take ``near_substeps`` smaller steps. Euler with ``dt=1`` reproduces the
+    original once-per-frame update only with ``near_substeps=1``, which the
+    pygame front-ends use; the default of 4 deliberately changes the path of
+    bodies near a hole from the first step.
+
+    Set ``profiler`` to an object with a ``phase(name)`` context manager to
+    time the body update, mutual gravity and black hole phases of each step.
+
+    Absorbed and merged planets are only marked dead during a step and are
+    swap-removed together at its end. Every absorption is appended to
+    ``absorptions``, an ``AbsorptionLog``.
+    """
+
+    def __init__(self, preset=DEFAULT_PRESET, window_size=WINDOW_SIZE, trail_length=20, collisions=True,
+                 mutual_gravity=False, theta=0.5, integrator=DEFAULT_INTEGRATOR, dt=1.0, near_substeps=4,
+                 **overrides):
+        settings = dict(PRESETS[preset])
+        settings.update(overrides)
+        self.preset = preset
+        self.settings = settings
+        self.window_size = window_size
+        self.throw_divisor = settings["throw_divisor"]
+
+        # Initialize the black hole at the center of the screen; more can be
+        # added with add_black_hole and all of them pull through self.field
+        self.field = GravityField()
+        self.black_hole = self.add_black_hole(window_size[0] // 2, window_size[1] // 2)
+        self.store = ParticleStore(trail_length=trail_length)
+        self.grid = SpatialHash() if collisions else None
+        self.mutual_gravity = mutual_gravity
+        self.theta = theta
+        self.integrator = INTEGRATORS[integrator]
+        self.dt = dt
+        self.near_substeps = near_substeps
+        self.planets = []  # Planet views, one per store row
+        self.next_id = 0
+        self.mouse_pos = (window_size[0] // 2, window_size[1] // 2)  # Default mouse position
+        self.frame = 0
+        self.absorbed = 0
+        self.merged = 0
+        self.absorptions = AbsorptionLog()
+        self.profiler = None
+
+    def _phase(self, name):
+        return self.profiler.phase(name) if self.profiler is not None else nullcontext()
+
+    def add_black_hole(self, x, y, radius=15, mass=1e15):
+        return self.field.add(BlackHole(x, y, radius, mass, **black_hole_options(self.settings)))
+
+    @property
+    def black_holes(self):
+        return self.field.holes
+
+    def add_planet(self, x, y, radius=10, velocity=(0, 0), done_creating=False, color=None):
+        index = self.store.add(x, y, radius, planet_mass(radius), velocity[0], velocity[1],
+                               creating=not done_creating, body_id=self.next_id)
+        planet = Planet(self.store, index, self.next_id, color)
+        self.planets.append(planet)
+        self.next_id += 1
+        return planet
+
+    def release(self):
+        self.store.creating[:self.store.count] = False
+
+    def step(self):
+        with self._phase("bodies"):
+            self.merged += step_bodies(self.store, self.field, self.mouse_pos, self.throw_divisor,
+                                       self.trail_record, self.grid, self.integrator, self.dt, self.near_substeps)
+        if self.mutual_gravity:
+            with self._phase("gravity"):
+                apply_mutual_gravity(self.store, self.theta, strength=self.dt)
+        with self._phase("black_hole"):
+            absorbed = self.field.absorb(self.store, self.absorptions, self.frame + 1)
+            self.absorbed += int(absorbed.sum())
+            self.remove_dead()
+        self.frame += 1
+
+    def remove_dead(self):
+        # Swap-remove this step's absorbed and merged planets in one batch;
+        # only the views of removed and moved planets need touching
+        store = self.store
+        dead = ~store.alive[:store.count]
+        if not dead.any():
+            return
+        planets = self.planets
+        for row in np.flatnonzero(dead).tolist():
+            planets[row].index = -1
+        moved_from, moved_to = store.remove(dead)
+        for source, target in zip(moved_from.tolist(), moved_to.tolist()):
+            planets[target] = planets[source]
+            planets[target].index = target
+        del planets[store.count:]
+
+    def trail_record(self, store):
+        # Update trails to appear as a thin line; only left after release
+        n = store.count
+        store.record_trails(np.flatnonzero(store.alive[:n] & ~store.creating[:n]))
+
+    @property
+    def trail_length(self):
+        return self.store.trail_length
+
+    def set_trail_length(self, trail_length):
+        self.store.set_trail_length(trail_length)
+
+    @property
+    def time(self):
+        return self.frame * self.dt / FPS
+
+    def digest(self):
+        """SHA-256 of the complete body and black hole state, for comparing runs bit for bit."""
+        h = hashlib.sha256()
+        store = self.store
+        for name in store._columns():
+            h.update(np.ascontiguousarray(getattr(store, name)[:store.count]).tobytes())
+        holes = [[hole.x, hole.y, hole.radius, hole.mass, hole.accretion_disk_radius] for hole in self.black_holes]
+        h.update(np.array(sum(holes, []) + [self.frame, self.absorbed, self.merged], dtype=float).tobytes())
+        return h.hexdigest()
+
+
+def step_bodies(store, black_hole, mouse_pos, throw_divisor=2, on_moved=None, grid=None,
+                integrator=semi_implicit_euler, dt=1.0, near_substeps=1):
+    """Advance every planet in ``store`` by one fixed step of ``dt`` ticks.
+
+    ``black_hole`` is a ``BlackHole`` or a ``GravityField`` of several.
+    Planets that touch are merged when a ``SpatialHash`` is given. Returns the
+    number of planets merged away.
+    """
+    n = store.count
+    creating = store.creating[:n]
+    x, y = store.x[:n], store.y[:n]
+    radius = store.radius[:n]
+    store.prev_x[:n] = x
+    store.prev_y[:n] = y
+
+    # Planets still being created are thrown with the mouse's velocity
+    if creating.any():
+        store.vx[:n][creating] = (mouse_pos[0] - store.last_x[:n][creating]) / throw_divisor
+        store.vy[:n][creating] = (mouse_pos[1] - store.last_y[:n][creating]) / throw_divisor
+        store.last_x[:n][creating] = mouse_pos[0]
+        store.last_y[:n][creating] = mouse_pos[1]
+
+    merged = merge_overlapping(store, grid) if grid is not None else 0
+    move_bodies(store, black_hole, integrator, dt, near_substeps)
+
+    if on_moved is not None:
+        on_moved(store)
+
+    # Grow planets that are still being created and keep them on the mouse
+    if creating.any():
+        radius[creating & (radius <= 200)] += 0.35 * dt
+        x[creating] = mouse_pos[0]
+        y[creating] = mouse_pos[1]
+        store.mass[:n][creating] = np.pi * radius[creating] ** 2 * MASS_AREA_RATIO
+    return merged
+
+
+def move_bodies(store, black_hole, integrator=semi_implicit_euler, dt=1.0, near_substeps=1):
+    """Damp, pull and move every body in ``store``, then update its mass.
+
+    Each body only depends on itself and the holes, so this gives the same
+    result on any split of the rows (see ``simulation.parallel``).
+    """
+    n = store.count
+    # Finer steps close to the hole
+    near = black_hole.near(store.x[:n], store.y[:n])
+    if near_substeps > 1 and near.any():
+        integrate(store, black_hole, integrator, dt, np.flatnonzero(~near))
+        integrate(store, black_hole, integrator, dt, np.flatnonzero(near), near_substeps)
+    else:
+        integrate(store, black_hole, integrator, dt)
+    store.mass[:n] = np.pi * store.radius[:n] ** 2 * MASS_AREA_RATIO
+
+
+def populate(sim, count, rng, min_radius=5, max_radius=30, max_speed=6):
+    # Scatter already-released planets across the window with random drift
+    width, height = sim.window_size
+    for _ in range(count):
+        sim.add_planet(
+            rng.uniform(0, width),
+            rng.uniform(0, height),
+            radius=rng.uniform(min_radius, max_radius),
+            velocity=(rng.uniform(-max_speed, max_speed), rng.uniform(-max_speed, max_speed)),
+            done_creating=True,
+        )
+
+
+def iter_simulation(steps=600, seed=None, planets=40, preset=DEFAULT_PRESET, sample_every=1, chunk_size=256,
+                    checkpoint=None, checkpoint_every=1000, resume=None, trajectory=None, workers=None, **overrides):
+    """Run a headless simulation, yielding the black hole's mass as it goes.
+
+    Each chunk is a dict with up to ``chunk_size`` new ``time``/``mass``
+    samples, the number of steps run so far and the running
+    ``absorbed``/``merged`` counts, so only one chunk is held in memory at a
+    time however many steps are requested.
+
+    With ``checkpoint`` set, a snapshot is saved there every
+    ``checkpoint_every`` steps and at the end. ``resume`` continues from a
+    snapshot up to ``steps`` total, ignoring ``seed``, ``planets`` and the
+    settings. ``trajectory`` is a path to write every body's state to at
+    each sample (see ``simulation.trajectory``). ``workers`` steps the
+    bodies on that many processes (see ``simulation.parallel``); bodies
+    are only copied back for trajectory frames and checkpoints.
+    """
+    from .parallel import ParallelSimulation
+    from .snapshot import load_snapshot, save_snapshot  # snapshot imports this module
+    from .trajectory import TrajectoryWriter
+
+    if resume is not None:
+        sim = load_snapshot(resume)
+    else:
+        rng = random.Random(seed)
+        sim = Simulation(preset, trail_length=0, **overrides)
+        populate(sim, planets, rng)
+
+    writer = TrajectoryWriter(trajectory) if trajectory is not None else None
+    parallel = ParallelSimulation(sim, workers) if workers is not None else None
+    step_once, sync = (parallel.step, parallel.sync) if parallel is not None else (sim.step, lambda: None)
+    try:
+        first = sim.frame
+        frames = [first]
+        # The mass series comes from the absorption log: each chunk reads only
+        # the events logged since the previous one
+        log = sim.absorptions
+        mass, seen = sim.black_hole.mass, len(log)
+
+        def chunk(step):
+            nonlocal mass, seen
+            masses = log.mass_series(frames, mass, seen)
+            if len(masses):
+                mass = masses[-1]
+            seen = len(log)
+            return {"time": [frame * sim.dt / FPS for frame in frames], "mass": masses.tolist(), "step": step,
+                    "absorbed": sim.absorbed, "merged": sim.merged}
+
+        if writer is not None:
+            writer.write_frame(sim)
+        for step in range(first + 1, steps + 1):
+            step_once()
+            if step % sample_every == 0:
+                frames.append(step)
+                if writer is not None:
+                    sync()
+                    writer.write_frame(sim)
+            if checkpoint is not None and (step % checkpoint_every == 0 or step == steps):
+                sync()
+                save_snapshot(sim, checkpoint)
+            if len(frames) >= chunk_size or step == steps:
+                yield chunk(step)
+                frames = []
+        if steps <= first:
+            yield chunk(first)
+    finally:
+        if parallel is not None:
+            parallel.close()
+        if writer is not None:
+            writer.close()
+
+
+def run_simulation(steps=600, seed=None, planets=40, preset=DEFAULT_PRESET, sample_every=1, **overrides):
+    """Run a headless simulation and return the black hole's mass over time.
+
+    The result is a dict with ``time`` (seconds) and ``mass`` lists, which is
+    what ``static/js/scripts.js`` charts, plus the number of absorbed and
+    merged planets.
+    """
+    result = {"time": [], "mass": []}
+    for chunk in iter_simulation(steps, seed, planets, preset, sample_every, **overrides):
+        result["time"].extend(chunk["time"])
+        result["mass"].extend(chunk["mass"])
+        result["absorbed"] = chunk["absorbed"]
+        result["merged"] = chunk["merged"]
+    return result
@@ -0,0 +1,57 @@
+import numpy as np
+
+
+class AbsorptionLog:
+    """Append-only log of every planet swallowed by a black hole.
+
+    One row per absorption: the ``frame`` it happened in (the simulation's
+    frame count right after that step), the planet's ``body_id`` and
+    ``mass``, the index of the ``hole`` that took it and that hole's radius
+    and mass right after it grew. Columns are NumPy arrays with spare
+    capacity, like ``ParticleStore``, and a step's absorptions are appended
+    as one batch.
+    """
+
+    COLUMNS = {"frame": np.int64, "body_id": np.int64, "mass": np.float64, "hole": np.int64,
+               "hole_radius": np.float64, "hole_mass": np.float64}
+
+    def __init__(self, capacity=64):
+        self.capacity = capacity
+        self.count = 0
+        for name, dtype in self.COLUMNS.items():
+            setattr(self, name, np.zeros(capacity, dtype=dtype))
+
+    def __len__(self):
+        return self.count
+
+    def append(self, **columns):
+        """Append a batch of events, one equal-length array per column."""
+        size = len(columns["frame"])
+        if self.count + size > self.capacity:
+            capacity = max(self.count + size, 2 * self.capacity)
+            for name in self.COLUMNS:
+                column = np.zeros(capacity, dtype=self.COLUMNS[name])
+                column[:self.count] = getattr(self, name)[:self.count]
+                setattr(self, name, column)
+            self.capacity = capacity
+        for name in self.COLUMNS:
+            getattr(self, name)[self.count:self.count + size] = columns[name]
+        self.count += size
+
+    def since(self, start=0):
+        """Events from index ``start`` on, as a dict of column views."""
+        return {name: getattr(self, name)[start:self.count] for name in self.COLUMNS}
+
+    def mass_series(self, frames, mass, start=0, hole=0):
+        """Mass of ``hole`` after each of ``frames`` (ascending), from the events since ``start``.
+
+        ``mass`` is the hole's mass before those events. Only the events
+        from ``start`` on are read, so a caller walking forward through a
+        run never looks at the same event twice.
+        """
+        events = self.since(start)
+        mine = events["hole"] == hole
+        masses = np.concatenate([[mass], events["hole_mass"][mine]])
+        # Index of the last event at or before each frame, 0 for none
+        latest = np.searchsorted(events["frame"][mine], frames, side="right")
+        return masses[latest]
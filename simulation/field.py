@@ -0,0 +1,150 @@
+import numpy as np
+
+from .constants import G
+
+
+class GravityField:
+    """Any number of black holes acting on the bodies together.
+
+    Offers the same ``acceleration``/``damping_at``/``near``/``absorb``
+    interface as a single ``BlackHole``, so the integrators and
+    ``step_bodies`` take either. Every hole's parameters and layered pull
+    profile (its radial lookup table of layer radii and multipliers) are
+    stacked into ``(holes, ...)`` arrays, rebuilt only when a hole is added
+    or its ``version`` changes on ``grow``. Each evaluation is then one pass
+    over a ``(holes, bodies)`` grid, with a ``np.searchsorted`` per hole
+    into its table.
+    """
+
+    def __init__(self, holes=()):
+        self.holes = []
+        self._versions = None
+        for hole in holes:
+            self.add(hole)
+
+    def add(self, hole):
+        self.holes.append(hole)
+        self._versions = None
+        return hole
+
+    def __len__(self):
+        return len(self.holes)
+
+    def _refresh(self):
+        versions = [hole.version for hole in self.holes]
+        if versions == self._versions:
+            return
+        holes = self.holes
+
+        def column(name):
+            return np.array([getattr(hole, name) for hole in holes], dtype=float)[:, None]
+
+        self.hx, self.hy = column("x"), column("y")
+        self.mass, self.radius = column("mass"), column("radius")
+        self.disk_radius = column("accretion_disk_radius")
+        self.disk_damping, self.disk_damping_slope = column("disk_damping"), column("disk_damping_slope")
+        self.outer_damping, self.horizon_damping = column("outer_damping"), column("horizon_damping")
+
+        # Pad every table to the same number of layers; extra layers repeat the
+        # outermost radius with no pull, so lookups past it still give zero
+        layers = max(len(hole.layer_radii) for hole in holes)
+        self.layer_radii = np.empty((len(holes), layers))
+        self.layer_table = np.zeros((len(holes), layers + 1))
+        for i, hole in enumerate(holes):
+            count = len(hole.layer_radii)
+            self.layer_radii[i, :count] = hole.layer_radii
+            self.layer_radii[i, count:] = hole.layer_radii[-1]
+            self.layer_table[i, :count + 1] = hole.layer_table
+        self._versions = versions
+
+    def _distances(self, x, y):
+        self._refresh()
+        dx = self.hx - x
+        dy = self.hy - y
+        return dx, dy, np.sqrt(dx * dx + dy * dy)
+
+    def pull_strength(self, distance):
+        """Layer multiplier of every hole at ``distance``, shaped ``(holes, bodies)``."""
+        layer = np.empty(distance.shape, dtype=np.intp)
+        for i, radii in enumerate(self.layer_radii):
+            layer[i] = np.searchsorted(radii, distance[i])
+        return np.take_along_axis(self.layer_table, layer, axis=1)
+
+    def acceleration(self, x, y):
+        """Summed pull of every hole on bodies at ``(x, y)``, in px per tick squared."""
+        dx, dy, distance = self._distances(x, y)
+
+        # Unit vectors towards each hole; no trig needed
+        safe = np.where(distance > 0, distance, 1)
+        ux = np.where(distance > 0, dx / safe, 0)
+        uy = np.where(distance > 0, dy / safe, 0)
+
+        # Prevent division by zero near the centers
+        clamped = np.maximum(distance, 1)
+        acceleration = G * self.mass / (clamped ** 2) * self.pull_strength(clamped)
+        return (ux * acceleration).sum(axis=0), (uy * acceleration).sum(axis=0)
+
+    def damping_at(self, x, y):
+        # Damping of whichever hole is nearest relative to its size
+        _, _, distance = self._distances(x, y)
+        damping = np.where(
+            distance < self.disk_radius,
+            self.disk_damping - (distance / self.disk_radius) * self.disk_damping_slope,
+            self.outer_damping,
+        )
+        damping = np.where(distance < self.radius * 2, np.maximum(self.horizon_damping, damping), damping)
+        nearest = np.argmin(distance / self.radius, axis=0)
+        return np.take_along_axis(damping, nearest[None, :], axis=0)[0]
+
+    def near(self, x, y):
+        """Bodies within twice the radius of any hole."""
+        _, _, distance = self._distances(x, y)
+        return (distance < self.radius * 2).any(axis=0)
+
+    def captures(self, store):
+        """Which live planets are within reach of a hole, and of which one.
+
+        Returns the boolean mask of rows in reach and, for each of those
+        rows in order, the index of the hole taking it (the first in reach).
+        Nothing is changed, so the check can run on any split of the rows.
+        """
+        n = store.count
+        _, _, distance = self._distances(store.x[:n], store.y[:n])
+        distance = np.maximum(distance, 1)
+
+        # Immediate absorption if within visual radius of a black hole
+        within = store.alive[:n] & (distance < 1.2 * self.radius + store.radius[:n])
+        absorbed = within.any(axis=0)
+        return absorbed, np.argmax(within[:, absorbed], axis=0)
+
+    def swallow(self, owner, body_id, mass, log=None, frame=0):
+        """Grow each hole once per planet it took; ``owner`` is each planet's hole.
+
+        With an ``AbsorptionLog`` every absorption is appended to ``log``,
+        grouped by hole.
+        """
+        owner = np.asarray(owner)
+        counts = np.bincount(owner, minlength=len(self.holes))
+        radii, masses = [], []
+        for hole, count in zip(self.holes, counts):
+            if count:
+                grown = hole.grow(int(count))  # Increase black hole size and accretion disk
+                radii.extend(grown[0])
+                masses.extend(grown[1])
+        if log is not None and radii:
+            order = np.argsort(owner, kind="stable")
+            log.append(frame=np.full(len(order), frame), body_id=np.asarray(body_id)[order],
+                       mass=np.asarray(mass)[order], hole=owner[order], hole_radius=radii, hole_mass=masses)
+
+    def absorb(self, store, log=None, frame=0):
+        """Absorb every live planet within reach of any hole.
+
+        Returns the boolean mask of rows absorbed this step. A planet in reach
+        of several holes goes to the first; each hole grows once per planet
+        it absorbed, after the whole batch has been checked (see ``swallow``).
+        """
+        absorbed, owner = self.captures(store)
+        store.alive[:store.count] &= ~absorbed
+        rows = np.flatnonzero(absorbed)
+        self.swallow(owner, store.body_id[rows], store.mass[rows], log, frame)
+        return absorbed
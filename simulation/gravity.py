@@ -0,0 +1,156 @@
+import numpy as np
+
+from .constants import G
+
+MAX_DEPTH = 16  # Quadtree levels below the root; 16 bits per axis in the Morton codes
+
+
+def _spread_bits(v):
+    # Insert a zero bit between each of the low 16 bits of v
+    v = v & np.uint64(0x0000FFFF)
+    for shift, mask in ((8, 0x00FF00FF), (4, 0x0F0F0F0F), (2, 0x33333333), (1, 0x55555555)):
+        v = (v | (v << np.uint64(shift))) & np.uint64(mask)
+    return v
+
+
+class _Level:
+    def __init__(self, prefix, count, mass, com_x, com_y):
+        self.prefix = prefix
+        self.count = count
+        self.mass = mass
+        self.com_x = com_x
+        self.com_y = com_y
+
+
+class QuadTree:
+    """Barnes-Hut quadtree built level by level from sorted Morton codes.
+
+    Every level is a set of flat arrays (cell prefix, body count, mass and
+    centre of mass), so both building and walking the tree are NumPy passes
+    over whole levels rather than per-node Python objects.
+    """
+
+    def __init__(self, x, y, mass, max_depth=MAX_DEPTH):
+        self.max_depth = max_depth
+        self.origin_x = float(x.min())
+        self.origin_y = float(y.min())
+        extent = max(float(x.max()) - self.origin_x, float(y.max()) - self.origin_y)
+        self.size = extent * (1 + 1e-9) if extent > 0 else 1.0
+
+        cells = 1 << max_depth
+        ix = np.minimum(((x - self.origin_x) / self.size * cells).astype(np.uint64), cells - 1)
+        iy = np.minimum(((y - self.origin_y) / self.size * cells).astype(np.uint64), cells - 1)
+        codes = _spread_bits(ix) | (_spread_bits(iy) << np.uint64(1))
+        order = np.argsort(codes, kind="stable")
+        codes = codes[order]
+        mass = mass[order]
+        weighted_x = mass * x[order]
+        weighted_y = mass * y[order]
+
+        self.levels = []
+        for level in range(max_depth + 1):
+            prefix = codes >> np.uint64(2 * (max_depth - level))
+            starts = np.flatnonzero(np.r_[True, prefix[1:] != prefix[:-1]])
+            node_mass = np.add.reduceat(mass, starts)
+            safe_mass = np.where(node_mass > 0, node_mass, 1)
+            self.levels.append(_Level(
+                prefix[starts],
+                np.diff(np.r_[starts, len(codes)]),
+                node_mass,
+                np.add.reduceat(weighted_x, starts) / safe_mass,
+                np.add.reduceat(weighted_y, starts) / safe_mass,
+            ))
+
+    def accelerations(self, x, y, theta=0.5, softening=1.0, chunk_size=4096):
+        """Acceleration at each point ``(x[i], y[i])`` from every body in the tree.
+
+        A cell is treated as a point mass when ``size / distance < theta`` or
+        when it holds a single body; otherwise its children are visited.
+        """
+        ax = np.zeros(len(x))
+        ay = np.zeros(len(x))
+        eps2 = softening * softening
+        theta2 = theta * theta
+
+        for first in range(0, len(x), chunk_size):
+            px = x[first:first + chunk_size]
+            py = y[first:first + chunk_size]
+            count = len(px)
+
+            # Frontier of (target, node) pairs still to be resolved, starting at the root
+            target = np.arange(count)
+            node = np.zeros(count, dtype=np.intp)
+            for depth, level in enumerate(self.levels):
+                if len(target) == 0:
+                    break
+                size = self.size / (1 << depth)
+                dx = level.com_x[node] - px[target]
+                dy = level.com_y[node] - py[target]
+                d2 = dx * dx + dy * dy
+                accept = (size * size < theta2 * d2) | (level.count[node] == 1) | (depth == self.max_depth)
+
+                # Point-mass contribution of accepted cells; skip a body's own cell
+                hit = accept & (d2 > 0)
+                r2 = d2[hit] + eps2
+                strength = G * level.mass[node[hit]] / (r2 * np.sqrt(r2))
+                ax[first:first + count] += np.bincount(target[hit], strength * dx[hit], count)
+                ay[first:first + count] += np.bincount(target[hit], strength * dy[hit], count)
+
+                # Open the rest: children share the parent's prefix in the next level
+                opened = ~accept
+                if depth == self.max_depth or not opened.any():
+                    break
+                target = target[opened]
+                prefix = level.prefix[node[opened]] << np.uint64(2)
+                child_prefix = self.levels[depth + 1].prefix
+                start = np.searchsorted(child_prefix, prefix, side="left")
+                counts = np.searchsorted(child_prefix, prefix + np.uint64(4), side="left") - start
+                total = int(counts.sum())
+                offsets = np.arange(total) - np.repeat(np.cumsum(counts) - counts, counts)
+                node = np.repeat(start, counts) + offsets
+                target = np.repeat(target, counts)
+        return ax, ay
+
+
+def barnes_hut_accelerations(x, y, mass, theta=0.5, softening=1.0):
+    """Mutual gravitational acceleration of every body, approximated with a quadtree."""
+    if len(x) < 2:
+        return np.zeros(len(x)), np.zeros(len(x))
+    return QuadTree(x, y, mass).accelerations(x, y, theta, softening)
+
+
+def direct_accelerations(x, y, mass, softening=1.0, targets=None, chunk_size=1024):
+    """Exact pairwise sum, O(n^2); used as the reference for Barnes-Hut.
+
+    ``targets`` limits the evaluation to a subset of bodies so the reference
+    stays affordable for large n.
+    """
+    targets = np.arange(len(x)) if targets is None else np.asarray(targets)
+    ax = np.zeros(len(targets))
+    ay = np.zeros(len(targets))
+    eps2 = softening * softening
+    for first in range(0, len(targets), chunk_size):
+        rows = targets[first:first + chunk_size]
+        dx = x[None, :] - x[rows, None]
+        dy = y[None, :] - y[rows, None]
+        r2 = dx * dx + dy * dy
+        self_pair = r2 == 0
+        r2 += eps2
+        strength = np.where(self_pair, 0, G * mass[None, :] / (r2 * np.sqrt(r2)))
+        ax[first:first + chunk_size] = (strength * dx).sum(axis=1)
+        ay[first:first + chunk_size] = (strength * dy).sum(axis=1)
+    return ax, ay
+
+
+def apply_mutual_gravity(store, theta=0.5, softening=1.0, strength=1.0):
+    """Kick every live planet's velocity by the pull of all the others.
+
+    ``strength`` is the kick's duration in ticks. ``Simulation.step`` applies
+    it once per step after the integrator (operator splitting), so the
+    body-body pull is first-order in ``dt`` whatever the integrator.
+    """
+    n = store.count
+    alive = np.flatnonzero(store.alive[:n])
+    ax, ay = barnes_hut_accelerations(store.x[alive], store.y[alive], store.mass[alive], theta, softening)
+    store.vx[alive] += strength * ax
+    store.vy[alive] += strength * ay
@@ -0,0 +1,403 @@
+"""Physics for large headless runs, split across processes over shared memory.
+
+    with ParallelSimulation(sim, workers=4) as parallel:
+        for _ in range(steps):
+            parallel.step()
+    # sim holds the final state again
+
+The window is cut into vertical strips (tiles), one per worker process,
+with edges at quantiles of the planets' x so each starts with the same
+load. Every ``ParticleStore`` column lives in one
+``multiprocessing.shared_memory`` block, split into a fixed-capacity
+segment per tile, and each worker updates its own segment in place, so no
+body data is ever pickled; only the small per-step results (touching pairs
+and absorbed ids) go over the pipes. A step:
+
+1. Every worker finds the touching pairs between its bodies and a halo of
+   other tiles' bodies within reach of its strip.
+2. The parent merges them with ``merge_pairs``, as ``Simulation.step`` does.
+3. Every worker moves its bodies (``move_bodies``), records trails and
+   checks which planets a hole captures.
+4. Barrier. Bodies that crossed into another strip are copied to the end
+   of that tile's segment. Barrier. Every worker compacts its segment.
+5. The parent grows the holes and logs the absorptions.
+
+Each body ends up exactly as it would after ``Simulation.step``, but rows
+are in a different order, so compare runs by planet id (merges only
+depend on row order when two touching planets have exactly equal mass).
+The absorption log holds the same events per frame, in tile order.
+Mutual gravity isn't supported.
+"""
+import multiprocessing
+import traceback
+from multiprocessing import shared_memory
+
+import numpy as np
+
+from .collisions import SpatialHash, merge_pairs
+from .core import BlackHole, black_hole_options, move_bodies
+from .field import GravityField
+from .integrators import INTEGRATORS
+from .particles import ParticleStore, Planet
+
+HOLE_FIELDS = ("x", "y", "radius", "mass", "accretion_disk_radius")
+HEADROOM = 2.0  # Segment capacity relative to an even share of the bodies
+IMBALANCE = 2.0  # Re-split the strips when a tile holds this many times its share
+
+
+class _Failure:
+    """An exception raised on a worker, sent back instead of a result."""
+
+    def __init__(self, message):
+        self.message = message
+
+
+def _store(columns, count, trail_length):
+    # A ParticleStore whose columns are the given (shared) arrays
+    store = ParticleStore(capacity=0, trail_length=trail_length)
+    for name, column in columns.items():
+        setattr(store, name, column)
+    store.capacity = len(columns["x"])
+    store.count = count
+    return store
+
+
+def _attach(layout):
+    blocks, arrays = [], {}
+    for name, (block, shape, dtype) in layout.items():
+        memory = shared_memory.SharedMemory(name=block)
+        blocks.append(memory)
+        arrays[name] = np.ndarray(shape, dtype, buffer=memory.buf)
+    return blocks, arrays
+
+
+class _Tile:
+    """One worker's share of the step, over its segment of the shared arrays."""
+
+    def __init__(self, index, barrier, options):
+        self.index = index
+        self.barrier = barrier
+        self.options = options
+        self.integrator = INTEGRATORS[options["integrator"]]
+        self.grid = SpatialHash() if options["collisions"] else None
+        self.field = GravityField()
+        self.blocks = []
+
+    def attach(self, layout):
+        self.detach()
+        self.blocks, self.arrays = _attach(layout["arrays"])
+        self.tiles, self.capacity = layout["tiles"], layout["capacity"]
+        columns = {name: self.arrays[name] for name in layout["columns"]}
+        start = self.index * self.capacity
+        trail_length = self.options["trail_length"]
+        self.full = _store(columns, len(columns["x"]), trail_length)
+        self.segment = _store({name: column[start:start + self.capacity] for name, column in columns.items()},
+                              0, trail_length)
+
+    def detach(self, _=None):
+        self.arrays = self.full = self.segment = None
+        for memory in self.blocks:
+            memory.close()
+        self.blocks = []
+
+    def _sync_holes(self):
+        for row in self.arrays["holes"][len(self.field):]:
+            self.field.add(BlackHole(1.0, 1.0, 1.0, 1.0, **self.options["black_hole"]))
+        for hole, row in zip(self.field.holes, self.arrays["holes"]):
+            values = tuple(float(value) for value in row)
+            if values != tuple(getattr(hole, field) for field in HOLE_FIELDS):
+                for field, value in zip(HOLE_FIELDS, values):
+                    setattr(hole, field, value)
+                hole.refresh()
+
+    def pairs(self, _):
+        """Touching pairs of global rows with at least one body in this tile."""
+        k, cap = self.index, self.capacity
+        counts, bounds = self.arrays["counts"], self.arrays["bounds"]
+        segment, full = self.segment, self.full
+        n = segment.count = int(counts[k])
+        segment.prev_x[:n] = segment.x[:n]
+        segment.prev_y[:n] = segment.y[:n]
+        empty = np.empty(0, dtype=np.intp)
+        if self.grid is None or n == 0:
+            return empty, empty
+
+        # Bodies of other tiles close enough to touch one of ours
+        low, high = bounds[k, 0], bounds[k, 1]
+        reach = 2 * bounds[:, 2].max()
+        rows = [k * cap + np.flatnonzero(segment.alive[:n] & ~segment.creating[:n])]
+        for j in range(self.tiles):
+            if j == k or not counts[j] or bounds[j, 0] >= high + reach or bounds[j, 1] <= low - reach:
+                continue
+            start, stop = j * cap, j * cap + int(counts[j])
+            x = full.x[start:stop]
+            halo = full.alive[start:stop] & ~full.creating[start:stop] & (x > low - reach) & (x < high + reach)
+            rows.append(start + np.flatnonzero(halo))
+        rows = np.concatenate(rows)
+        if len(rows) < 2:
+            return empty, empty
+
+        x, y, radius = full.x[rows], full.y[rows], full.radius[rows]
+        self.grid.build(x, y, radius)
+        i, j = self.grid.overlapping_pairs(x, y, radius)
+        i, j = rows[i], rows[j]
+        # A pair across two tiles is found by both; the lower one reports it
+        mine = np.minimum(i // cap, j // cap) == k
+        return i[mine], j[mine]
+
+    def move(self, _):
+        """Move this tile's bodies, find captures and migrate across strips.
+
+        Returns each captured planet's hole, id and mass, and whether a
+        segment was too full to take the bodies moving into it.
+        """
+        self._sync_holes()
+        segment, options = self.segment, self.options
+        n = segment.count
+        move_bodies(segment, self.field, self.integrator, options["dt"], options["near_substeps"])
+        segment.record_trails(np.flatnonzero(segment.alive[:n] & ~segment.creating[:n]))
+        absorbed, owner = self.field.captures(segment)
+        segment.alive[:n] &= ~absorbed
+        rows = np.flatnonzero(absorbed)
+        captured = (owner, segment.body_id[rows].copy(), segment.mass[rows].copy())
+        return captured + (self._migrate(),)
+
+    def _migrate(self):
+        k, cap, tiles = self.index, self.capacity, self.tiles
+        arrays, segment, full = self.arrays, self.segment, self.full
+        counts, moves = arrays["counts"], arrays["moves"]
+        n = segment.count
+        live = segment.alive[:n]
+        dest = arrays["dest"][k * cap:k * cap + n]
+        dest[:] = np.searchsorted(arrays["edges"], segment.x[:n], side="right")
+        dest[~live] = -1
+        moves[k] = np.bincount(dest[live], minlength=tiles)
+        self.barrier.wait()
+
+        # Everyone sees the same matrix, so either all tiles migrate or none do
+        arriving = moves.sum(axis=0) - np.diagonal(moves)
+        overflow = bool((counts + arriving > cap).any())
+        keep = live.copy()
+        end = n
+        if not overflow:
+            keep &= dest == k
+            for j in np.flatnonzero(moves[:, k]):
+                if j == k:
+                    continue
+                start = j * cap
+                sources = start + np.flatnonzero(arrays["dest"][start:start + int(counts[j])] == k)
+                target = slice(k * cap + end, k * cap + end + len(sources))
+                for name in full._columns():
+                    column = getattr(full, name)
+                    column[target] = column[sources]
+                end += len(sources)
+            keep = np.concatenate([keep, np.ones(end - n, dtype=bool)])
+        self.barrier.wait()
+
+        # Nobody reads this segment any more this step; compact it in order
+        m = int(keep.sum())
+        for name in segment._columns():
+            column = getattr(segment, name)
+            column[:m] = column[:end][keep]
+        segment.alive[m:end] = False
+        segment.count = m
+        counts[k] = m
+        if m:
+            arrays["bounds"][k] = (segment.x[:m].min(), segment.x[:m].max(), segment.radius[:m].max())
+        else:
+            arrays["bounds"][k] = (np.inf, -np.inf, 0.0)
+        return overflow
+
+
+def _worker(index, connection, barrier, options):
+    tile = _Tile(index, barrier, options)
+    try:
+        while True:
+            command, argument = connection.recv()
+            if command == "stop":
+                break
+            try:
+                result = getattr(tile, command)(argument)
+            except Exception:
+                barrier.abort()  # Release the other workers instead of leaving them waiting
+                result = _Failure(traceback.format_exc())
+            connection.send(result)
+    finally:
+        tile.detach()
+
+
+class ParallelSimulation:
+    """Steps a headless ``Simulation`` on ``workers`` processes.
+
+    The simulation's bodies are moved into shared memory, so ``sim.store``
+    and ``sim.planets`` are stale until ``sync`` (or ``close``, which
+    syncs) copies them back; the black holes, counters, ``frame`` and
+    absorption log stay current on ``sim`` after every step.
+    """
+
+    def __init__(self, sim, workers=None, headroom=HEADROOM):
+        if sim.mutual_gravity:
+            raise ValueError("mutual gravity isn't supported by the parallel step")
+        store = sim.store
+        if store.creating[:store.count].any():
+            raise ValueError("every planet must be released before a parallel step")
+        self.sim = sim
+        self.workers = workers or multiprocessing.cpu_count()
+        self.headroom = headroom
+        self.capacity = 0
+        self.blocks = []
+        self.arrays = None
+        self.colors = {planet.planet_id: planet.color for planet in sim.planets}
+        self.closed = False
+        self.rebalance = False
+
+        context = multiprocessing.get_context("spawn")
+        self.barrier = context.Barrier(self.workers)
+        options = {
+            "integrator": next(name for name, function in INTEGRATORS.items() if function is sim.integrator),
+            "collisions": sim.grid is not None,
+            "dt": sim.dt,
+            "near_substeps": sim.near_substeps,
+            "trail_length": sim.trail_length,
+            "black_hole": black_hole_options(sim.settings),
+        }
+        self.connections, self.processes = [], []
+        for index in range(self.workers):
+            parent, child = context.Pipe()
+            process = context.Process(target=_worker, args=(index, child, self.barrier, options), daemon=True)
+            process.start()
+            self.connections.append(parent)
+            self.processes.append(process)
+        n = store.count
+        self._scatter({name: getattr(store, name)[:n] for name in store._columns()}, n)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def _broadcast(self, command, argument=None):
+        for connection in self.connections:
+            connection.send((command, argument))
+        results = [connection.recv() for connection in self.connections]
+        failures = [result.message for result in results if isinstance(result, _Failure)]
+        if failures:
+            raise RuntimeError("parallel step failed on a worker:\n" + failures[0])
+        return results
+
+    def _allocate(self, capacity):
+        # Fresh shared blocks for every column plus the per-step control arrays
+        template = self.sim.store
+        tiles = self.workers
+        specs = {name: ((tiles * capacity,) + getattr(template, name).shape[1:], getattr(template, name).dtype)
+                 for name in template._columns()}
+        specs.update({
+            "dest": ((tiles * capacity,), np.dtype(np.intp)),
+            "counts": ((tiles,), np.dtype(np.int64)),
+            "moves": ((tiles, tiles), np.dtype(np.int64)),
+            "bounds": ((tiles, 3), np.dtype(np.float64)),  # Min x, max x and max radius per tile
+            "edges": ((tiles - 1,), np.dtype(np.float64)),
+            "holes": ((len(self.sim.black_holes), len(HOLE_FIELDS)), np.dtype(np.float64)),
+        })
+        self._release()
+        layout, self.arrays = {}, {}
+        for name, (shape, dtype) in specs.items():
+            size = max(1, int(np.prod(shape)) * dtype.itemsize)
+            memory = shared_memory.SharedMemory(create=True, size=size)
+            self.blocks.append(memory)
+            self.arrays[name] = np.ndarray(shape, dtype, buffer=memory.buf)
+            layout[name] = (memory.name, shape, dtype.str)
+        self.capacity = capacity
+        columns = {name: self.arrays[name] for name in template._columns()}
+        self.full = _store(columns, tiles * capacity, template.trail_length)
+        return {"arrays": layout, "columns": list(columns), "tiles": tiles, "capacity": capacity}
+
+    def _release(self):
+        self.arrays = self.full = None
+        for memory in self.blocks:
+            memory.close()
+            memory.unlink()
+        self.blocks = []
+
+    def _scatter(self, columns, count):
+        # Split the bodies into strips of equal count and lay them out by tile
+        tiles = self.workers
+        x = columns["x"][:count]
+        edges = np.quantile(x, np.arange(1, tiles) / tiles) if count else np.zeros(tiles - 1)
+        dest = np.searchsorted(edges, x, side="right")
+        order = np.argsort(dest, kind="stable")
+        counts = np.bincount(dest, minlength=tiles)
+        capacity = max(int(self.headroom * count / tiles), int(counts.max())) + 64
+        if capacity > self.capacity or count < self.capacity * tiles / (4 * self.headroom):
+            self._broadcast("detach")
+            self._broadcast("attach", self._allocate(capacity))
+        capacity = self.capacity
+        arrays = self.arrays
+        starts = np.concatenate([[0], np.cumsum(counts)])
+        for name, column in columns.items():
+            target = arrays[name]
+            for k in range(tiles):
+                target[k * capacity:k * capacity + counts[k]] = column[:count][order[starts[k]:starts[k + 1]]]
+        for k in range(tiles):
+            arrays["alive"][k * capacity + counts[k]:(k + 1) * capacity] = False
+            rows = slice(k * capacity, k * capacity + counts[k])
+            if counts[k]:
+                arrays["bounds"][k] = (arrays["x"][rows].min(), arrays["x"][rows].max(), arrays["radius"][rows].max())
+            else:
+                arrays["bounds"][k] = (np.inf, -np.inf, 0.0)
+        arrays["counts"][:] = counts
+        arrays["edges"][:] = edges
+        self.rebalance = False
+
+    def _gather(self):
+        counts, capacity = self.arrays["counts"], self.capacity
+        rows = np.concatenate([np.arange(k * capacity, k * capacity + counts[k]) for k in range(self.workers)])
+        return {name: self.arrays[name][rows] for name in self.full._columns()}, len(rows)
+
+    def step(self):
+        sim = self.sim
+        if self.rebalance:
+            self._scatter(*self._gather())
+        self.arrays["holes"][:] = [[getattr(hole, field) for field in HOLE_FIELDS] for hole in sim.black_holes]
+        with sim._phase("bodies"):
+            pairs = self._broadcast("pairs")
+            if sim.grid is not None:
+                i = np.concatenate([pair[0] for pair in pairs])
+                j = np.concatenate([pair[1] for pair in pairs])
+                sim.merged += merge_pairs(self.full, i, j)
+            results = self._broadcast("move")
+        with sim._phase("black_hole"):
+            owner = np.concatenate([result[0] for result in results])
+            body_id = np.concatenate([result[1] for result in results])
+            mass = np.concatenate([result[2] for result in results])
+            sim.field.swallow(owner, body_id, mass, sim.absorptions, sim.frame + 1)
+            sim.absorbed += len(owner)
+        sim.frame += 1
+
+        counts = self.arrays["counts"]
+        overflow = any(result[3] for result in results)
+        self.rebalance = overflow or counts.max() > IMBALANCE * counts.mean() + 64
+
+    def sync(self):
+        """Copy the bodies back into ``sim.store`` and rebuild ``sim.planets``."""
+        columns, count = self._gather()
+        sim = self.sim
+        store = _store(columns, count, sim.trail_length)
+        store.index_slots()
+        sim.store = store
+        sim.planets = [Planet(store, i, int(planet_id), self.colors.get(int(planet_id)))
+                       for i, planet_id in enumerate(store.body_id[:count])]
+
+    def close(self):
+        if self.closed:
+            return
+        try:
+            self.sync()
+            for connection in self.connections:
+                connection.send(("stop", None))
+            for process in self.processes:
+                process.join()
+        finally:
+            self._release()
+            self.closed = True
@@ -0,0 +1,226 @@
+import numpy as np
+
+
+class ParticleStore:
+    """Planet state kept as contiguous NumPy columns (structure of arrays).
+
+    Row ``i`` of every column belongs to the same body. Only the first
+    ``count`` rows are in use; the rest is spare capacity so adding a body
+    doesn't reallocate every frame.
+
+    Rows are kept dense: ``remove`` fills each dead row with a live one from
+    the end (swap-remove), so removing k bodies moves at most k rows. Since
+    that changes rows, every body also has a ``slot``, a handle that stays
+    put for its whole life; ``rows`` maps slots back to rows and slots of
+    removed bodies go on the ``free`` list for reuse.
+
+    Trails are a preallocated ring of the last ``trail_length`` positions
+    per body. Every point is written twice, at ``slot`` and
+    ``slot + trail_length``, so the newest points in order are always one
+    contiguous slice of the row and can be read without copying.
+    """
+
+    FLOAT_COLUMNS = ("x", "y", "vx", "vy", "radius", "mass", "last_x", "last_y", "prev_x", "prev_y")
+    BOOL_COLUMNS = ("alive", "creating")
+    INT_COLUMNS = ("trail_head", "trail_count", "body_id", "slot")
+
+    def __init__(self, capacity=64, trail_length=20):
+        self.capacity = capacity
+        self.count = 0
+        self.trail_length = trail_length
+        for name in self.FLOAT_COLUMNS:
+            setattr(self, name, np.zeros(capacity))
+        for name in self.BOOL_COLUMNS:
+            setattr(self, name, np.zeros(capacity, dtype=bool))
+        for name in self.INT_COLUMNS:
+            setattr(self, name, np.zeros(capacity, dtype=np.intp))
+        self.trail = np.zeros((capacity, 2 * trail_length, 2))
+        self.rows = np.full(capacity, -1, dtype=np.intp)  # Slot -> row, -1 for a free slot
+        self.free = []  # Slots of removed bodies, reused last in first out
+
+    def __len__(self):
+        return self.count
+
+    def _columns(self):
+        return self.FLOAT_COLUMNS + self.BOOL_COLUMNS + self.INT_COLUMNS + ("trail",)
+
+    def _grow(self, capacity):
+        for name in self._columns():
+            old = getattr(self, name)
+            new = np.zeros((capacity,) + old.shape[1:], dtype=old.dtype)
+            new[:self.count] = old[:self.count]
+            setattr(self, name, new)
+        self.capacity = capacity
+
+    def set_trail_length(self, trail_length):
+        """Resize every trail ring, keeping the newest points that still fit."""
+        n = self.count
+        trail = np.zeros((self.capacity, 2 * trail_length, 2))
+        if trail_length:
+            for i in range(n):
+                points = self.trail_points(i)[-trail_length:]
+                trail[i, :len(points)] = points
+                trail[i, trail_length:trail_length + len(points)] = points
+            self.trail_count[:n] = np.minimum(self.trail_count[:n], trail_length)
+            self.trail_head[:n] = self.trail_count[:n] % trail_length
+        else:
+            self.trail_count[:n] = 0
+            self.trail_head[:n] = 0
+        self.trail = trail
+        self.trail_length = trail_length
+
+    def record_trails(self, rows):
+        """Append each body's current position to its trail ring."""
+        length = self.trail_length
+        if not length or len(rows) == 0:
+            return
+        head = self.trail_head[rows]
+        points = np.stack([self.x[rows], self.y[rows]], axis=1)
+        self.trail[rows, head] = points
+        self.trail[rows, head + length] = points
+        self.trail_head[rows] = (head + 1) % length
+        self.trail_count[rows] = np.minimum(self.trail_count[rows] + 1, length)
+
+    def trail_points(self, i):
+        """The trail of row ``i``, oldest point first, as a view into the ring."""
+        end = self.trail_head[i] + self.trail_length
+        return self.trail[i, end - self.trail_count[i]:end]
+
+    def add(self, x, y, radius, mass, vx=0.0, vy=0.0, creating=False, body_id=0):
+        if self.count == self.capacity:
+            self._grow(max(1, self.capacity * 2))
+        i = self.count
+        # Slots in use and free ones always cover 0..count+len(free)-1
+        slot = self.free.pop() if self.free else self.count
+        if slot == len(self.rows):
+            self.rows = np.concatenate([self.rows, np.full(max(1, len(self.rows)), -1, dtype=np.intp)])
+        self.rows[slot] = i
+        self.slot[i] = slot
+        self.body_id[i] = body_id
+        self.x[i], self.y[i] = x, y
+        self.vx[i], self.vy[i] = vx, vy
+        self.radius[i] = radius
+        self.mass[i] = mass
+        self.last_x[i], self.last_y[i] = x, y
+        self.prev_x[i], self.prev_y[i] = x, y
+        self.alive[i] = True
+        self.creating[i] = creating
+        self.trail_head[i] = self.trail_count[i] = 0
+        self.count += 1
+        return i
+
+    def row_of(self, slot):
+        """Current row of the body in ``slot``, or -1 if it was removed."""
+        return int(self.rows[slot]) if slot < len(self.rows) else -1
+
+    def remove(self, dead):
+        """Swap-remove every row flagged in the boolean mask ``dead``.
+
+        Live rows past the new ``count`` move into the dead rows before it,
+        so only as many rows move as were removed. Returns the ``(moved_from,
+        moved_to)`` row arrays so callers can remap anything indexed by row.
+        """
+        n = self.count
+        dead = dead[:n]
+        dead_rows = np.flatnonzero(dead)
+        k = n - len(dead_rows)
+        holes = dead_rows[dead_rows < k]
+        movers = k + np.flatnonzero(~dead[k:])  # As many live rows past k as dead rows before it
+
+        freed = self.slot[dead_rows]
+        self.rows[freed] = -1
+        self.free.extend(freed.tolist())
+        for name in self._columns():
+            column = getattr(self, name)
+            column[holes] = column[movers]
+        self.rows[self.slot[holes]] = holes
+        self.count = k
+        return movers, holes
+
+    def index_slots(self, free=None):
+        """Rebuild ``rows`` from the ``slot`` column, e.g. after loading columns.
+
+        ``free`` is the saved free list; without it every unused slot below
+        the highest one in use is free.
+        """
+        n = self.count
+        slots = self.slot[:n]
+        if free is None:
+            used = np.zeros(int(slots.max()) + 1 if n else 0, dtype=bool)
+            used[slots] = True
+            free = np.flatnonzero(~used)[::-1].tolist()
+        self.free = list(free)
+        self.rows = np.full(max(self.capacity, n + len(self.free), 1), -1, dtype=np.intp)
+        self.rows[slots] = np.arange(n)
+
+
+def _column(name):
+    def get(self):
+        return getattr(self._store, name)[self.index]
+
+    def set(self, value):
+        getattr(self._store, name)[self.index] = value
+
+    return property(get, set)
+
+
+class Planet:
+    """A view of one row of a ``ParticleStore``.
+
+    Reads and writes go straight to the store's columns, so the renderers can
+    keep using ``planet.x``, ``planet.velocity`` and friends while the physics
+    runs over whole columns at once.
+    """
+
+    x = _column("x")
+    y = _column("y")
+    radius = _column("radius")
+    mass = _column("mass")
+    planet_id = _column("body_id")
+    slot = _column("slot")  # Stable handle; see ParticleStore.row_of
+
+    def __init__(self, store, index, planet_id, color=None):
+        self._store = store
+        self.index = index
+        self.planet_id = planet_id
+        self.color = color  # Only used by the renderers
+
+    @property
+    def velocity(self):
+        return (self._store.vx[self.index], self._store.vy[self.index])
+
+    @velocity.setter
+    def velocity(self, value):
+        self._store.vx[self.index], self._store.vy[self.index] = value
+
+    @property
+    def last_pos(self):
+        return (self._store.last_x[self.index], self._store.last_y[self.index])
+
+    @last_pos.setter
+    def last_pos(self, value):
+        self._store.last_x[self.index], self._store.last_y[self.index] = value
+
+    @property
+    def doneCreating(self):
+        return not self._store.creating[self.index]
+
+    @doneCreating.setter
+    def doneCreating(self, value):
+        self._store.creating[self.index] = not value
+
+    @property
+    def trail(self):
+        # Recent positions, oldest first; a view, so don't keep it across steps
+        return self._store.trail_points(self.index)
+
+    def interpolated(self, alpha):
+        # Position between the previous and current physics step, for rendering
+        store, i = self._store, self.index
+        return (store.prev_x[i] + (store.x[i] - store.prev_x[i]) * alpha,
+                store.prev_y[i] + (store.y[i] - store.prev_y[i]) * alpha)
+
+    @property
+    def alive(self):
+        # Removed planets have their index set to -1
+        return self.index >= 0 and bool(self._store.alive[self.index])
@@ -0,0 +1,185 @@
+"""Binary snapshots of a whole simulation, for checkpoints and restores.
+
+Layout (all little-endian)::
+
+    b"DHSNAP\\0\\0"  uint32 version  uint32 header length
+    JSON header, padded with spaces so the first array is 64-byte aligned
+    one contiguous, 64-byte aligned block per array
+
+The header records the settings needed to rebuild the ``Simulation`` and,
+for every array, its dtype, shape and byte offset. The arrays are every
+``ParticleStore`` column up to ``count`` rows, the planet ids and colours,
+every black hole's mutable state (one row per hole) and the absorption log
+columns, so ``load_snapshot`` can map them straight from the file with
+``numpy.memmap`` instead of parsing anything.
+"""
+import json
+import os
+import struct
+import tempfile
+
+import numpy as np
+
+from .core import Simulation
+from .integrators import INTEGRATORS
+from .particles import Planet
+
+MAGIC = b"DHSNAP\0\0"
+VERSION = 1
+ALIGNMENT = 64
+
+_PREFIX = struct.Struct("<II")
+BLACK_HOLE_FIELDS = ("x", "y", "radius", "mass", "accretion_disk_radius")
+
+
+def _align(offset):
+    return -(-offset // ALIGNMENT) * ALIGNMENT
+
+
+def _arrays(sim):
+    store = sim.store
+    n = store.count
+    arrays = {name: getattr(store, name)[:n] for name in store._columns()}
+    arrays["planet_id"] = store.body_id[:n].astype(np.int64)  # Also a column now; kept for older readers
+    # -1 marks a planet without a colour (headless runs)
+    arrays["color"] = np.array([planet.color if planet.color is not None else (-1, -1, -1)
+                                for planet in sim.planets], dtype=np.int16).reshape(n, 3)
+    arrays["black_hole"] = np.array([[getattr(hole, field) for field in BLACK_HOLE_FIELDS] for hole in sim.black_holes],
+                                    dtype=np.float64)
+    arrays["free_slots"] = np.array(store.free, dtype=np.int64)  # In order, so restored runs reuse the same slots
+    for name, column in sim.absorptions.since().items():
+        arrays["absorption_" + name] = column
+    return arrays
+
+
+def save_snapshot(sim, path):
+    """Write ``sim`` to ``path``; the file is replaced atomically."""
+    arrays = {name: np.ascontiguousarray(array, dtype=array.dtype.newbyteorder("<"))
+              for name, array in _arrays(sim).items()}
+    integrator = next(name for name, function in INTEGRATORS.items() if function is sim.integrator)
+    header = {
+        "preset": sim.preset,
+        "settings": sim.settings,
+        "window_size": list(sim.window_size),
+        "trail_length": sim.trail_length,
+        "collisions": sim.grid is not None,
+        "mutual_gravity": sim.mutual_gravity,
+        "theta": sim.theta,
+        "integrator": integrator,
+        "dt": sim.dt,
+        "near_substeps": sim.near_substeps,
+        "count": sim.store.count,
+        "frame": sim.frame,
+        "absorbed": sim.absorbed,
+        "merged": sim.merged,
+        "next_id": sim.next_id,
+        "mouse_pos": list(sim.mouse_pos),
+        "arrays": {},
+    }
+
+    # Offsets depend on the header's length and vice versa, so lay the
+    # arrays out relative to the data start and fix that up afterwards
+    layout, offset = {}, 0
+    for name, array in arrays.items():
+        layout[name] = offset
+        offset = _align(offset + array.nbytes)
+    base = 0
+    while True:
+        header["arrays"] = {name: {"dtype": array.dtype.str, "shape": list(array.shape), "offset": base + layout[name]}
+                            for name, array in arrays.items()}
+        encoded = json.dumps(header).encode()
+        start = _align(len(MAGIC) + _PREFIX.size + len(encoded))
+        if start == base:
+            break
+        base = start
+    encoded = encoded.ljust(base - len(MAGIC) - _PREFIX.size)
+
+    directory = os.path.dirname(os.path.abspath(path))
+    fd, tmp = tempfile.mkstemp(dir=directory, suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(MAGIC + _PREFIX.pack(VERSION, len(encoded)) + encoded)
+            for name, array in arrays.items():
+                f.seek(header["arrays"][name]["offset"])
+                f.write(array.tobytes())
+            # Empty arrays (no absorptions or free slots yet) sit at the very
+            # end, so pad to the last offset or mapping them would overrun
+            f.truncate(base + offset)
+        os.replace(tmp, path)
+    except BaseException:
+        if os.path.exists(tmp):
+            os.remove(tmp)
+        raise
+
+
+def read_snapshot(path, mode="c"):
+    """The header and a dict of arrays mapped from ``path``.
+
+    The default copy-on-write ``mode`` gives writable arrays without
+    touching the file; pass ``"r"`` for read-only inspection.
+    """
+    with open(path, "rb") as f:
+        prefix = f.read(len(MAGIC) + _PREFIX.size)
+        if not prefix.startswith(MAGIC):
+            raise ValueError(f"{path} is not a simulation snapshot")
+        version, length = _PREFIX.unpack_from(prefix, len(MAGIC))
+        if version != VERSION:
+            raise ValueError(f"unsupported snapshot version {version}")
+        header = json.loads(f.read(length))
+
+    mapped = np.memmap(path, mode=mode)
+    arrays = {name: np.ndarray(tuple(spec["shape"]), np.dtype(spec["dtype"]), buffer=mapped, offset=spec["offset"])
+              for name, spec in header["arrays"].items()}
+    return header, arrays
+
+
+def load_snapshot(path, mmap=True):
+    """Rebuild the ``Simulation`` saved in ``path``.
+
+    With ``mmap`` the body columns stay mapped copy-on-write, so restoring
+    is near instant whatever the body count; the store only copies them
+    when it has to grow. Otherwise they are read into memory.
+    """
+    header, arrays = read_snapshot(path)
+    if not mmap:
+        arrays = {name: np.array(array) for name, array in arrays.items()}
+
+    # The saved settings are passed as overrides, so later preset edits don't leak in
+    sim = Simulation(
+        header["preset"], tuple(header["window_size"]), trail_length=header["trail_length"],
+        collisions=header["collisions"], mutual_gravity=header["mutual_gravity"], theta=header["theta"],
+        integrator=header["integrator"], dt=header["dt"], near_substeps=header["near_substeps"],
+        **header["settings"],
+    )
+
+    store = sim.store
+    n = header["count"]
+    for name in store._columns():
+        if name in arrays:
+            setattr(store, name, arrays[name])
+        else:  # Written before the column existed; body_id is filled in with the planets below
+            column = getattr(store, name)
+            setattr(store, name, np.arange(n) if name == "slot" else np.zeros((n,) + column.shape[1:], column.dtype))
+    store.count = store.capacity = n
+    store.index_slots(arrays["free_slots"].tolist() if "free_slots" in arrays else None)
+
+    if "absorption_frame" in arrays:
+        sim.absorptions.append(**{name: arrays["absorption_" + name] for name in sim.absorptions.COLUMNS})
+
+    for i, row in enumerate(arrays["black_hole"].reshape(-1, len(BLACK_HOLE_FIELDS))):
+        hole = sim.black_hole if i == 0 else sim.add_black_hole(row[0], row[1])
+        for field, value in zip(BLACK_HOLE_FIELDS, row):
+            setattr(hole, field, float(value))
+        hole.refresh()
+
+    colors = arrays["color"]
+    sim.planets = [
+        Planet(store, i, int(planet_id), tuple(int(c) for c in colors[i]) if colors[i, 0] >= 0 else None)
+        for i, planet_id in enumerate(arrays["planet_id"])
+    ]
+    sim.frame = header["frame"]
+    sim.absorbed = header["absorbed"]
+    sim.merged = header["merged"]
+    sim.next_id = header["next_id"]
+    sim.mouse_pos = tuple(header["mouse_pos"])
+    return sim
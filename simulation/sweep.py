@@ -0,0 +1,102 @@
+"""Run headless simulations over a grid of tuning parameters and seeds.
+
+    python -m simulation.sweep grid.json --seeds 0 1 2 --out sweep.npz
+
+``grid.json`` maps any ``PRESETS`` key to a list of values to try, e.g.
+``{"growth_factor": [1.004, 1.009], "outer_damping": [0.95, 0.98]}``; every
+combination is run for every seed across a process pool. The summaries are
+written as one NumPy array per column to an ``.npz`` file.
+"""
+import argparse
+import itertools
+import json
+import math
+import os
+import random
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from .core import DEFAULT_PRESET, PRESETS, Simulation, populate
+
+SUMMARY_COLUMNS = ("seed", "final_mass", "final_radius", "absorbed", "merged", "time_to_absorb", "steps_run")
+
+
+def expand_grid(grid):
+    """All combinations of a ``{key: [values]}`` grid, as a list of override dicts."""
+    keys = sorted(grid)
+    for key in keys:
+        if key not in PRESETS[DEFAULT_PRESET]:
+            raise ValueError(f"unknown parameter {key!r}")
+    return [dict(zip(keys, values)) for values in itertools.product(*(grid[key] for key in keys))]
+
+
+def summarize_run(task):
+    """Run one configuration headless and return its summary row."""
+    preset, overrides, seed, steps, planets = task
+    sim = Simulation(preset, trail_length=0, **overrides)
+    populate(sim, planets, random.Random(seed))
+
+    time_to_absorb = math.nan
+    while sim.frame < steps:
+        sim.step()
+        if not sim.planets:
+            # Nothing left to absorb, so the rest of the run can't change anything
+            time_to_absorb = sim.time
+            break
+
+    return {
+        "seed": seed,
+        "final_mass": sim.black_hole.mass,
+        "final_radius": sim.black_hole.radius,
+        "absorbed": sim.absorbed,
+        "merged": sim.merged,
+        "time_to_absorb": time_to_absorb,
+        "steps_run": sim.frame,
+    }
+
+
+def run_sweep(grid, seeds, preset=DEFAULT_PRESET, steps=600, planets=40, workers=None):
+    """Run every grid configuration for every seed and return the columns.
+
+    Parameter columns are named after the grid keys; tuple-valued parameters
+    such as ``layer_multipliers`` become 2-D arrays with one row per run.
+    """
+    configs = expand_grid(grid)
+    tasks = [(preset, overrides, seed, steps, planets) for overrides in configs for seed in seeds]
+    workers = workers or os.cpu_count()
+    chunksize = max(1, len(tasks) // (workers * 8))
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        rows = list(pool.map(summarize_run, tasks, chunksize=chunksize))
+
+    columns = {"config": np.repeat(np.arange(len(configs)), len(seeds))}
+    for key in sorted(grid):
+        columns[key] = np.array([task[1][key] for task in tasks])
+    for name in SUMMARY_COLUMNS:
+        columns[name] = np.array([row[name] for row in rows])
+    return columns
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("grid", help="JSON file mapping parameter names to lists of values")
+    parser.add_argument("--preset", default=DEFAULT_PRESET, choices=sorted(PRESETS))
+    parser.add_argument("--seeds", type=int, nargs="+", default=[0])
+    parser.add_argument("--steps", type=int, default=600)
+    parser.add_argument("--planets", type=int, default=40)
+    parser.add_argument("--workers", type=int, default=None, help="defaults to every core")
+    parser.add_argument("--out", default="sweep.npz")
+    args = parser.parse_args()
+
+    with open(args.grid) as f:
+        grid = json.load(f)
+
+    start = time.perf_counter()
+    columns = run_sweep(grid, args.seeds, args.preset, args.steps, args.planets, args.workers)
+    np.savez_compressed(args.out, **columns)
+    print(f"{len(columns['seed'])} runs in {time.perf_counter() - start:.1f}s -> {args.out}")
+
+
+if __name__ == "__main__":
+    main()
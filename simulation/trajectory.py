@@ -0,0 +1,174 @@
+"""Per-body trajectories streamed to disk in compressed, seekable chunks.
+
+Layout (little-endian)::
+
+    b"DHTRAJ\\0\\0"  uint32 version
+    chunk, chunk, ...     each column of ``frames_per_chunk`` frames, zlib-compressed
+    frame block           per-frame step, time, hole mass/radius and body count, compressed
+    JSON index            dtypes, and each chunk's first frame, rows and column offsets
+    uint64 index offset   b"DHTRAJ\\0\\0"
+
+A frame is one row per live body. Rows of all frames in a chunk are
+concatenated column by column, so ``TrajectoryReader.read`` only has to
+decompress the chunks that overlap the requested frames. The body count
+per frame (and so every frame's row range) comes from the frame block.
+"""
+import json
+import struct
+import zlib
+
+import numpy as np
+
+MAGIC = b"DHTRAJ\0\0"
+VERSION = 1
+
+# Body columns and their on-disk dtypes; float32 halves the size and is
+# far more precision than any analysis or chart needs
+COLUMNS = {
+    "id": "<i4",
+    "x": "<f4",
+    "y": "<f4",
+    "vx": "<f4",
+    "vy": "<f4",
+    "radius": "<f4",
+    "mass": "<f4",
+}
+FRAME_COLUMNS = {"step": "<i8", "time": "<f8", "hole_mass": "<f8", "hole_radius": "<f8", "count": "<i8"}
+
+_VERSION = struct.Struct("<I")
+_FOOTER = struct.Struct("<Q")
+
+
+class TrajectoryWriter:
+    """Append frames of a running ``Simulation`` to ``path``.
+
+    Frames are buffered until ``frames_per_chunk`` have been collected and
+    then compressed and written, so memory stays bounded however long the
+    run. The file is only readable after ``close``, which writes the index.
+    """
+
+    def __init__(self, path, frames_per_chunk=256, level=6):
+        self.file = open(path, "wb")
+        self.file.write(MAGIC + _VERSION.pack(VERSION))
+        self.frames_per_chunk = frames_per_chunk
+        self.level = level
+        self.chunks = []
+        self.frames = {name: [] for name in FRAME_COLUMNS}
+        self._pending = {name: [] for name in COLUMNS}
+        self._pending_frames = 0
+        self._first = 0
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def write_frame(self, sim):
+        store = sim.store
+        n = store.count
+        pending = self._pending
+        pending["id"].append(store.body_id[:n].copy())
+        for name in ("x", "y", "vx", "vy", "radius", "mass"):
+            pending[name].append(getattr(store, name)[:n].copy())
+        hole = sim.black_hole
+        for name, value in (("step", sim.frame), ("time", sim.time), ("hole_mass", hole.mass),
+                            ("hole_radius", hole.radius), ("count", n)):
+            self.frames[name].append(value)
+        self._pending_frames += 1
+        if self._pending_frames == self.frames_per_chunk:
+            self._flush()
+
+    def _compress(self, array, dtype):
+        data = zlib.compress(np.ascontiguousarray(array, dtype=dtype).tobytes(), self.level)
+        offset = self.file.tell()
+        self.file.write(data)
+        return [offset, len(data)]
+
+    def _flush(self):
+        if not self._pending_frames:
+            return
+        columns = {name: self._compress(np.concatenate(parts), COLUMNS[name])
+                   for name, parts in self._pending.items()}
+        rows = sum(len(part) for part in self._pending["x"])
+        self.chunks.append({"first": self._first, "frames": self._pending_frames, "rows": rows, "columns": columns})
+        self._first += self._pending_frames
+        self._pending = {name: [] for name in COLUMNS}
+        self._pending_frames = 0
+
+    def close(self):
+        if self.file.closed:
+            return
+        self._flush()
+        frames = {name: self._compress(np.asarray(values), FRAME_COLUMNS[name]) for name, values in self.frames.items()}
+        index = {"columns": COLUMNS, "frame_columns": FRAME_COLUMNS, "frames": self._first,
+                 "frame_block": frames, "chunks": self.chunks}
+        index_offset = self.file.tell()
+        self.file.write(json.dumps(index).encode())
+        self.file.write(_FOOTER.pack(index_offset) + MAGIC)
+        self.file.close()
+
+
+class TrajectoryReader:
+    """Random access to the frames of a trajectory file."""
+
+    def __init__(self, path):
+        self.path = path
+        with open(path, "rb") as f:
+            if f.read(len(MAGIC)) != MAGIC:
+                raise ValueError(f"{path} is not a trajectory file")
+            (version,) = _VERSION.unpack(f.read(_VERSION.size))
+            if version != VERSION:
+                raise ValueError(f"unsupported trajectory version {version}")
+            f.seek(-(_FOOTER.size + len(MAGIC)), 2)
+            footer = f.read()
+            if not footer.endswith(MAGIC):
+                raise ValueError(f"{path} is incomplete; was the writer closed?")
+            (index_offset,) = _FOOTER.unpack_from(footer)
+            f.seek(index_offset)
+            self.index = json.loads(f.read()[:-(_FOOTER.size + len(MAGIC))])
+            self.frame_data = {name: self._decompress(f, spec, self.index["frame_columns"][name])
+                               for name, spec in self.index["frame_block"].items()}
+        self.chunks = self.index["chunks"]
+        self.chunk_starts = np.array([chunk["first"] for chunk in self.chunks], dtype=np.int64)
+        # First row of every frame within its own chunk
+        counts = self.frame_data["count"]
+        self.row_starts = np.zeros(len(counts) + 1, dtype=np.int64)
+        np.cumsum(counts, out=self.row_starts[1:])
+
+    def __len__(self):
+        return self.index["frames"]
+
+    @staticmethod
+    def _decompress(f, spec, dtype):
+        offset, size = spec
+        f.seek(offset)
+        return np.frombuffer(zlib.decompress(f.read(size)), dtype=dtype)
+
+    def read(self, start=0, stop=None, stride=1, columns=None):
+        """Frames ``start:stop:stride`` as flat body columns.
+
+        Returns a dict with the per-frame series (``step``, ``time``,
+        ``hole_mass``, ``hole_radius``, ``count``), ``offsets`` where each
+        frame's rows begin in the flat arrays (plus the final end), and one
+        array per requested body column. Only overlapping chunks are read.
+        """
+        frames = np.arange(len(self))[start:stop:stride]
+        columns = list(self.index["columns"]) if columns is None else columns
+        result = {name: values[frames] for name, values in self.frame_data.items()}
+        parts = {name: [] for name in columns}
+        if len(frames):
+            chunk_ids = np.searchsorted(self.chunk_starts, frames, side="right") - 1
+            with open(self.path, "rb") as f:
+                for chunk_id in np.unique(chunk_ids):
+                    chunk = self.chunks[chunk_id]
+                    wanted = frames[chunk_ids == chunk_id]
+                    base = self.row_starts[chunk["first"]]
+                    rows = np.concatenate([np.arange(self.row_starts[i], self.row_starts[i + 1]) for i in wanted]) - base
+                    for name in columns:
+                        data = self._decompress(f, chunk["columns"][name], self.index["columns"][name])
+                        parts[name].append(data[rows])
+        for name in columns:
+            result[name] = np.concatenate(parts[name]) if parts[name] else np.zeros(0, self.index["columns"][name])
+        result["offsets"] = np.concatenate([[0], np.cumsum(result["count"])])
+        return result
@@ -1,69 +1,159 @@
 document.addEventListener('DOMContentLoaded', function() {
     const playButton = document.getElementById('playButton');
-    const ctx = document.getElementById('simulationChart').getContext('2d');
+    const canvas = document.getElementById('simulationChart');
+    const ctx = canvas.getContext('2d');
+    // More points than the canvas has pixels can't be seen, so the server thins them
+    const points = canvas.width * 2;
     let chart = null; // To store the Chart instance
 
-    playButton.addEventListener('click', function() {
-        // Disable the Play button to prevent multiple clicks
-        playButton.disabled = true;
-        playButton.textContent = 'Running...';
+    function createChart() {
+        // If a chart already exists, destroy it before creating a new one
+        if (chart) {
+            chart.destroy();
+        }
 
-        fetch('/simulate')
-            .then(response => response.json())
-            .then(data => {
-                // If a chart already exists, destroy it before creating a new one
-                if (chart) {
-                    chart.destroy();
-                }
-
-                chart = new Chart(ctx, {
-                    type: 'line',
-                    data: {
-                        labels: data.time,
-                        datasets: [{
-                            label: 'Mass Over Time',
-                            data: data.mass,
-                            borderColor: 'rgba(255, 0, 0, 1)',
-                            backgroundColor: 'rgba(255, 0, 0, 0.2)',
-                            fill: true
-                        }]
+        chart = new Chart(ctx, {
+            type: 'line',
+            data: {
+                labels: [],
+                datasets: [{
+                    label: 'Mass Over Time',
+                    data: [],
+                    borderColor: 'rgba(255, 0, 0, 1)',
+                    backgroundColor: 'rgba(255, 0, 0, 0.2)',
+                    fill: true
+                }]
+            },
+            options: {
+                animation: false, // Points are appended as they stream in
+                onClick: zoomAt,
+                scales: {
+                    x: {
+                        title: {
+                            display: true,
+                            text: 'Time'
+                        }
                     },
-                    options: {
-                        scales: {
-                            x: {
-                                title: {
-                                    display: true,
-                                    text: 'Time'
-                                }
-                            },
-                            y: {
-                                title: {
-                                    display: true,
-                                    text: 'Mass'
-                                }
-                            }
-                        },
-                        plugins: {
-                            title: {
-                                display: true,
-                                text: 'Black Hole Mass Simulation'
-                            }
+                    y: {
+                        title: {
+                            display: true,
+                            text: 'Mass'
                         }
                     }
-                });
+                },
+                plugins: {
+                    title: {
+                        display: true,
+                        text: 'Black Hole Mass Simulation'
+                    }
+                }
+            }
+        });
+    }
 
-                // Re-enable the Play button after simulation completes
-                playButton.disabled = false;
-                playButton.textContent = 'Play';
-            })
+    function appendPoints(data) {
+        chart.data.labels.push(...data.time);
+        chart.data.datasets[0].data.push(...data.mass);
+        chart.update('none');
+    }
+
+    const SERIES_TYPE = 'application/vnd.dahacks.series';
+
+    function decodeSeries(buffer) {
+        // 24-byte little-endian header (see web/binary.py), then the time and
+        // mass arrays; the typed arrays are views on the response buffer
+        const header = new DataView(buffer);
+        const itemSize = header.getUint8(5);
+        const count = header.getUint32(8, true);
+        const FloatArray = itemSize === 4 ? Float32Array : Float64Array;
+        return {
+            time: new FloatArray(buffer, 24, count),
+            mass: new FloatArray(buffer, 24 + count * itemSize, count),
+            total: header.getUint32(12, true),
+            absorbed: header.getUint32(16, true),
+            merged: header.getUint32(20, true)
+        };
+    }
+
+    async function fetchSeries(url) {
+        // Ask for raw floats; the server answers JSON if it can't
+        const response = await fetch(url, { headers: { Accept: `${SERIES_TYPE}, application/json;q=0.5` } });
+        if (!response.ok) {
+            throw new Error(`Simulation failed with status ${response.status}`);
+        }
+        if ((response.headers.get('Content-Type') || '').startsWith(SERIES_TYPE)) {
+            return decodeSeries(await response.arrayBuffer());
+        }
+        return response.json();
+    }
+
+    async function zoomAt(event, elements, clicked) {
+        // Clicking the chart refetches a window a quarter as wide around that
+        // time, at full resolution once it is short enough
+        const labels = clicked.data.labels;
+        const index = clicked.scales.x.getValueForPixel(event.x);
+        if (labels.length < 2 || index === undefined) {
+            return;
+        }
+        const first = labels[0];
+        const last = labels[labels.length - 1];
+        const half = (last - first) / 8;
+        const centre = labels[Math.max(0, Math.min(labels.length - 1, index))];
+        const data = await fetchSeries(`/simulate?points=${points}&start=${centre - half}&end=${centre + half}`);
+        chart.data.labels = data.time;
+        chart.data.datasets[0].data = data.mass;
+        chart.update('none');
+    }
+
+    async function streamSimulation() {
+        // Each line of the response is a JSON chunk of time/mass samples
+        const response = await fetch(`/simulate/stream?points=${points}`);
+        if (!response.ok) {
+            throw new Error(`Simulation failed with status ${response.status}`);
+        }
+        if (!response.body) {
+            // No streaming support: fall back to the full response
+            appendPoints(await fetchSeries(`/simulate?points=${points}`));
+            return;
+        }
+
+        const reader = response.body.getReader();
+        const decoder = new TextDecoder();
+        let buffered = '';
+        while (true) {
+            const { value, done } = await reader.read();
+            if (done) {
+                break;
+            }
+            buffered += decoder.decode(value, { stream: true });
+            const lines = buffered.split('\n');
+            buffered = lines.pop(); // Keep any partial line for the next read
+            for (const line of lines) {
+                if (line.trim()) {
+                    appendPoints(JSON.parse(line));
+                }
+            }
+        }
+        if (buffered.trim()) {
+            appendPoints(JSON.parse(buffered));
+        }
+    }
+
+    playButton.addEventListener('click', function() {
+        // Disable the Play button to prevent multiple clicks
+        playButton.disabled = true;
+        playButton.textContent = 'Running...';
+        createChart();
+
+        streamSimulation()
             .catch(error => {
                 console.error('Error fetching simulation data:', error);
                 alert('Failed to run the simulation. Please try again.');
-
-                // Re-enable the Play button in case of error
+            })
+            .finally(() => {
+                // Re-enable the Play button after the simulation completes or fails
                 playButton.disabled = false;
                 playButton.textContent = 'Play';
             });
     });
 });
-
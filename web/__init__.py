@@ -0,0 +1 @@
+"""Helpers for the Flask app in ``app.py``."""
@@ -0,0 +1,37 @@
+import struct
+
+import numpy as np
+
+MIMETYPE = "application/vnd.dahacks.series"
+MAGIC = b"DHSM"
+VERSION = 1
+
+# magic, version, bytes per float, reserved, samples, total, absorbed, merged;
+# 24 bytes, so the arrays that follow are 8-byte aligned for Float64Array
+HEADER = struct.Struct("<4sBBHIIII")
+
+
+def encode_series(result, precision=32):
+    """``time`` and ``mass`` as raw little-endian floats behind a small header.
+
+    The arrays are joined straight from their NumPy buffers, so the floats
+    are copied once into the payload and never formatted. (WSGI servers such
+    as gunicorn only accept ``bytes``, so the parts can't be sent as views.)
+    """
+    dtype = {32: "<f4", 64: "<f8"}[precision]
+    time = np.asarray(result["time"], dtype=dtype)
+    mass = np.asarray(result["mass"], dtype=dtype)
+    header = HEADER.pack(MAGIC, VERSION, time.itemsize, 0, len(time), result.get("total", len(time)),
+                         result.get("absorbed", 0), result.get("merged", 0))
+    return b"".join((header, time, mass))
+
+
+def decode_series(data):
+    """Inverse of ``encode_series``, mainly for tests and Python clients."""
+    magic, version, itemsize, _, count, total, absorbed, merged = HEADER.unpack_from(data)
+    if magic != MAGIC or version != VERSION:
+        raise ValueError("not a simulation series")
+    dtype = "<f4" if itemsize == 4 else "<f8"
+    time = np.frombuffer(data, dtype, count, HEADER.size)
+    mass = np.frombuffer(data, dtype, count, HEADER.size + count * itemsize)
+    return {"time": time, "mass": mass, "total": total, "absorbed": absorbed, "merged": merged}
@@ -0,0 +1,60 @@
+import numpy as np
+
+
+def lttb(x, y, threshold):
+    """Indices of ``threshold`` points chosen by Largest-Triangle-Three-Buckets.
+
+    The first and last points are always kept. Between them the series is
+    cut into ``threshold - 2`` equal buckets, and from each bucket the point
+    forming the largest triangle with the previously chosen point and the
+    average of the next bucket is kept, which preserves peaks and steps far
+    better than taking every n-th point. Bucket averages and triangle areas
+    are computed with NumPy; only the walk from bucket to bucket is a loop,
+    since each choice depends on the one before.
+    """
+    x = np.asarray(x, dtype=float)
+    y = np.asarray(y, dtype=float)
+    n = len(x)
+    if threshold >= n or threshold < 3:
+        return np.arange(n)
+
+    buckets = threshold - 2
+    edges = (np.arange(buckets + 1) * (n - 2) / buckets).astype(np.intp) + 1
+    edges[-1] = n - 1
+    sizes = np.diff(edges)
+    # Average of every bucket, then shifted so entry i is the bucket after i
+    avg_x = np.add.reduceat(x[:n - 1], edges[:-1]) / sizes
+    avg_y = np.add.reduceat(y[:n - 1], edges[:-1]) / sizes
+    next_x = np.append(avg_x[1:], x[-1])
+    next_y = np.append(avg_y[1:], y[-1])
+
+    chosen = np.empty(threshold, dtype=np.intp)
+    chosen[0], chosen[-1] = 0, n - 1
+    a = 0
+    for i in range(buckets):
+        lo, hi = edges[i], edges[i + 1]
+        ax, ay = x[a], y[a]
+        area = np.abs((ax - next_x[i]) * (y[lo:hi] - ay) - (ax - x[lo:hi]) * (next_y[i] - ay))
+        a = lo + int(np.argmax(area))
+        chosen[i + 1] = a
+    return chosen
+
+
+def downsample(result, points=None, start=None, end=None):
+    """A copy of a ``time``/``mass`` result limited to a window and a point budget.
+
+    ``start``/``end`` keep only samples in that time range (seconds), at
+    full resolution when they fit in ``points``; otherwise the window is
+    reduced to ``points`` samples with ``lttb``. ``total`` is the number of
+    samples in the window before downsampling.
+    """
+    time = np.asarray(result["time"], dtype=float)
+    mass = np.asarray(result["mass"], dtype=float)
+    lo = 0 if start is None else int(np.searchsorted(time, start, side="left"))
+    hi = len(time) if end is None else int(np.searchsorted(time, end, side="right"))
+    time, mass = time[lo:hi], mass[lo:hi]
+    total = len(time)
+    if points is not None and total > points:
+        keep = lttb(time, mass, points)
+        time, mass = time[keep], mass[keep]
+    return dict(result, time=time.tolist(), mass=mass.tolist(), total=total)
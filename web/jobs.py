@@ -0,0 +1,183 @@
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+import simulation
+
+QUEUED = "queued"
+RUNNING = "running"
+DONE = "done"
+CANCELLED = "cancelled"
+FAILED = "failed"
+FINISHED = (DONE, CANCELLED, FAILED)
+
+
+class QueueFull(Exception):
+    """Raised when a job is submitted while the queue is at capacity."""
+
+
+class Job:
+    def __init__(self, params):
+        self.id = uuid.uuid4().hex
+        self.params = params
+        self.status = QUEUED
+        self.step = 0
+        self.time = []
+        self.mass = []
+        self.absorbed = 0
+        self.merged = 0
+        self.error = None
+        self.created = time.time()
+        self.finished = None
+        self.cancel_requested = threading.Event()
+        self.lock = threading.Lock()
+
+    @property
+    def progress(self):
+        steps = self.params.get("steps", 0)
+        return 1.0 if self.status == DONE or not steps else self.step / steps
+
+    def add_chunk(self, chunk):
+        with self.lock:
+            self.time.extend(chunk["time"])
+            self.mass.extend(chunk["mass"])
+            self.step = chunk["step"]
+            self.absorbed = chunk["absorbed"]
+            self.merged = chunk["merged"]
+
+    def finish(self, status, error=None):
+        with self.lock:
+            self.status = status
+            self.error = error
+            self.finished = time.time()
+
+    def describe(self):
+        with self.lock:
+            return {
+                "id": self.id,
+                "status": self.status,
+                "progress": self.progress,
+                "step": self.step,
+                "samples": len(self.time),
+                "error": self.error,
+            }
+
+    def samples(self, start=0):
+        """Samples from index ``start`` on, so pollers can fetch only what is new."""
+        with self.lock:
+            return {
+                "id": self.id,
+                "status": self.status,
+                "start": start,
+                "time": self.time[start:],
+                "mass": self.mass[start:],
+                "absorbed": self.absorbed,
+                "merged": self.merged,
+            }
+
+    def result(self):
+        with self.lock:
+            return {"time": list(self.time), "mass": list(self.mass),
+                    "absorbed": self.absorbed, "merged": self.merged}
+
+
+class JobQueue:
+    """Bounded in-process pool running simulations in the background.
+
+    At most ``max_active`` jobs may be queued or running at once; submitting
+    more raises ``QueueFull`` so a burst of requests is turned away instead of
+    piling up; a queued job cancelled before it starts stops counting at
+    once. The last ``keep_finished`` finished jobs stay available for
+    polling. ``on_done(params, result)`` is called for each completed run.
+
+    Jobs live in this process only: under gunicorn with several workers a
+    poll may reach a worker that never saw the job and get a 404, so run the
+    job endpoints on a single worker or behind sticky routing.
+    """
+
+    def __init__(self, workers=2, max_active=8, keep_finished=64, on_done=None):
+        self.max_active = max_active
+        self.keep_finished = keep_finished
+        self.on_done = on_done
+        self._pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="simulation-job")
+        self._jobs = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _active(self):
+        return sum(job.status not in FINISHED for job in self._jobs.values())
+
+    def submit(self, params):
+        with self._lock:
+            if self._active() >= self.max_active:
+                raise QueueFull(f"{self.max_active} simulations already queued or running")
+            job = Job(params)
+            self._jobs[job.id] = job
+            self._prune()
+        self._pool.submit(self._run, job)
+        return job
+
+    def add_finished(self, params, result):
+        """Record an already-known result (e.g. from the cache) as a done job."""
+        job = Job(params)
+        job.add_chunk(dict(result, step=params.get("steps", 0)))
+        job.finish(DONE)
+        with self._lock:
+            self._jobs[job.id] = job
+            self._prune()
+        return job
+
+    def get(self, job_id):
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def cancel(self, job_id):
+        """Ask a job to stop; finished jobs are left as they are.
+
+        A queued job is cancelled on the spot, freeing its place in the
+        queue; a running one stops at its next chunk of samples.
+        """
+        job = self.get(job_id)
+        if job is None:
+            return None
+        with job.lock:
+            if job.status == QUEUED:
+                job.status = CANCELLED
+                job.finished = time.time()
+            elif job.status == RUNNING:
+                job.cancel_requested.set()
+        return job
+
+    def stats(self):
+        with self._lock:
+            counts = {}
+            for job in self._jobs.values():
+                counts[job.status] = counts.get(job.status, 0) + 1
+            return {"max_active": self.max_active, "jobs": counts}
+
+    def _prune(self):
+        finished = [job_id for job_id, job in self._jobs.items() if job.status in FINISHED]
+        for job_id in finished[:max(0, len(finished) - self.keep_finished)]:
+            del self._jobs[job_id]
+
+    def _run(self, job):
+        with job.lock:
+            if job.status != QUEUED:  # Cancelled while waiting for a worker
+                return
+            job.status = RUNNING
+        steps = job.params.get("steps", 0)
+        try:
+            # Cancellation is checked between chunks of samples; once the
+            # last one is in the run is complete whatever was asked
+            for chunk in simulation.iter_simulation(**job.params):
+                job.add_chunk(chunk)
+                if job.cancel_requested.is_set() and chunk["step"] < steps:
+                    job.finish(CANCELLED)
+                    return
+        except Exception as error:
+            job.finish(FAILED, str(error))
+            return
+        job.finish(DONE)
+        if self.on_done is not None:
+            self.on_done(job.params, job.result())